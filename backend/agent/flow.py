@@ -41,6 +41,7 @@ def create_general_agent_flow():
     
     # Connect optimization flow
     optimizer - "optimize_workflow" >> designer  # Go back to design with improvements
+    optimizer - "retry_workflow" >> executor  # Re-run the same design after transient errors
     optimizer - "workflow_success" >> end_node  # End flow with completion node
     
     return AsyncFlow(start=designer)
@@ -1,6 +1,7 @@
 from pocketflow import Node
 from typing import Dict, List, Any, Optional
 from agent.utils.stream_llm import call_llm
+from agent.utils import json_utils
 import logging
 import json
 import re
@@ -164,10 +165,10 @@ Output your citation analysis in JSON format:
         "example_usage": "Example of proper citation usage"
     }},
     "metadata": {{
-        "generated_date": "{datetime.now().isoformat()}",
+        "generated_date": "{datetime.now().date().isoformat()}",
         "citation_count": 0,
         "style_version": "{citation_style} style guide",
-        "last_updated": "{datetime.now().isoformat()}"
+        "last_updated": "{datetime.now().date().isoformat()}"
     }}
 }}
 ```
@@ -177,11 +178,11 @@ Ensure all citations follow proper {citation_style.upper()} formatting guideline
         
         try:
             logger.info("🤖 CitationManagerNode: Calling LLM for citation generation")
-            response = call_llm(prompt)
+            response = call_llm(prompt, use_cache=True)
             
             # Extract JSON from response
-            json_str = response.split("```json")[1].split("```")[0].strip()
-            citations = json.loads(json_str)
+            json_str = json_utils.fenced_block(response)
+            citations = json_utils.loads(json_str)
             
             logger.info("✅ CitationManagerNode: Successfully parsed citations")
             
@@ -205,6 +206,8 @@ Ensure all citations follow proper {citation_style.upper()} formatting guideline
         """Extract all unique sources from research findings and search results"""
         sources = []
         seen_urls = set()
+        # Read the clock once rather than for every source
+        access_date = datetime.now().strftime("%Y-%m-%d")
         
         # Extract sources from search results
         for result in search_results:
@@ -215,7 +218,7 @@ Ensure all citations follow proper {citation_style.upper()} formatting guideline
                     "title": result.get("title", "Unknown Title"),
                     "snippet": result.get("snippet", ""),
                     "source_type": result.get("source_type", "web"),
-                    "access_date": datetime.now().strftime("%Y-%m-%d"),
+                    "access_date": access_date,
                     "from_search": True
                 })
                 seen_urls.add(url)
@@ -234,7 +237,7 @@ Ensure all citations follow proper {citation_style.upper()} formatting guideline
                         "content": finding.get("finding", ""),
                         "source_type": finding.get("source_type", "web"),
                         "credibility_score": finding.get("credibility_score", 0.5),
-                        "access_date": finding.get("extracted_date", datetime.now().isoformat())[:10],
+                        "access_date": finding.get("extracted_date", access_date)[:10],
                         "from_research": True
                     })
                     seen_urls.add(source)
@@ -251,7 +254,7 @@ Ensure all citations follow proper {citation_style.upper()} formatting guideline
                         "author": opinion.get("expert", ""),
                         "expertise_area": opinion.get("expertise_area", ""),
                         "credibility": opinion.get("credibility", "medium"),
-                        "access_date": datetime.now().strftime("%Y-%m-%d"),
+                        "access_date": access_date,
                         "from_research": True
                     })
                     seen_urls.add(source)
@@ -1,6 +1,7 @@
 from pocketflow import Node
 from typing import Dict, List, Any, Optional
 from agent.utils.stream_llm import call_llm
+from agent.utils import json_utils
 import logging
 import json
 from datetime import datetime
@@ -181,7 +182,7 @@ Output your synthesis in JSON format:
     }},
     "synthesis_metadata": {{
         "total_sub_questions_analyzed": 0,
-        "synthesis_date": "{datetime.now().isoformat()}",
+        "synthesis_date": "{datetime.now().date().isoformat()}",
         "synthesis_method": "LLM-based comprehensive analysis",
         "quality_score": 0.0-1.0,
         "reliability_assessment": "high|medium|low"
@@ -194,11 +195,11 @@ Focus on providing evidence-based insights with clear attribution to sources and
         
         try:
             logger.info("🤖 InformationSynthesizerNode: Calling LLM for synthesis")
-            response = call_llm(prompt)
+            response = call_llm(prompt, use_cache=True)
             
             # Extract JSON from response
-            json_str = response.split("```json")[1].split("```")[0].strip()
-            synthesis = json.loads(json_str)
+            json_str = json_utils.fenced_block(response)
+            synthesis = json_utils.loads(json_str)
             
             logger.info("✅ InformationSynthesizerNode: Successfully parsed synthesis")
             
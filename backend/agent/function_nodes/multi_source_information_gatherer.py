@@ -1,13 +1,26 @@
 from pocketflow import Node
 from typing import Dict, List, Any, Optional
 from agent.utils.stream_llm import call_llm
+from agent.utils import json_utils
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import heapq
 import logging
 import json
+import operator
 import re
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+_WORD_RE = re.compile(r"\w+")
+_relevance_score = operator.itemgetter("relevance_score")
+
+@functools.lru_cache(maxsize=256)
+def _question_keywords(question_text: str) -> frozenset:
+    """Keyword set of a question, reused when the same question is filtered again"""
+    return frozenset(_WORD_RE.findall(question_text.lower()))
+
 class MultiSourceInformationGathererNode(Node):
     """
     Node to gather information from multiple sources based on research sub-questions.
@@ -93,7 +106,7 @@ Output your analysis in JSON format:
                 "credibility_score": 0.0-1.0,
                 "relevance_score": 0.0-1.0,
                 "supporting_evidence": "Evidence or context",
-                "extracted_date": "{datetime.now().isoformat()}"
+                "extracted_date": "{datetime.now().date().isoformat()}"
             }}
         ],
         "data_points": [
@@ -165,11 +178,11 @@ Focus on extracting factual, verifiable information that directly addresses the
         
         try:
             logger.info("🤖 MultiSourceInformationGathererNode: Calling LLM for information analysis")
-            response = call_llm(prompt)
+            response = call_llm(prompt, use_cache=True)
             
             # Extract JSON from response
-            json_str = response.split("```json")[1].split("```")[0].strip()
-            information = json.loads(json_str)
+            json_str = json_utils.fenced_block(response)
+            information = json_utils.loads(json_str)
             
             logger.info("✅ MultiSourceInformationGathererNode: Successfully parsed information")
             
@@ -189,32 +202,44 @@ Focus on extracting factual, verifiable information that directly addresses the
             logger.error(f"❌ MultiSourceInformationGathererNode: Unexpected error: {e}")
             raise
     
+    def exec_batch(self, inputs_list: List[tuple], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Run exec for several sub-questions at once, returning results in input order.
+        
+        exec keeps no per-call state on the node and only annotates copies of the
+        search results, so sub-questions may share one result list; call_llm is
+        network-bound, so the LLM round trips overlap in worker threads instead of
+        adding up.
+        """
+        if not inputs_list:
+            return []
+        workers = max_workers or min(32, len(inputs_list))
+        logger.info(f"🔄 MultiSourceInformationGathererNode: exec_batch - {len(inputs_list)} sub-questions on {workers} workers")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.exec, inputs_list))
+    
     def _extract_relevant_search_results(self, question_text: str, search_results: List[Dict]) -> List[Dict]:
         """Extract search results most relevant to the current question"""
         if not search_results:
             return []
         
         # Simple relevance filtering based on keyword matching
-        question_keywords = set(re.findall(r'\b\w+\b', question_text.lower()))
+        question_keywords = _question_keywords(question_text)
+        if not question_keywords:
+            return []
+        keyword_count = len(question_keywords)
         relevant_results = []
         
         for result in search_results:
-            # Check title and snippet for keyword matches
-            title = result.get("title", "").lower()
-            snippet = result.get("snippet", "").lower()
-            content = f"{title} {snippet}"
-            
-            # Count keyword matches
-            content_words = set(re.findall(r'\b\w+\b', content))
-            matches = len(question_keywords.intersection(content_words))
+            # Count keyword matches in title and snippet
+            content = f"{result.get('title', '')} {result.get('snippet', '')}".lower()
+            matches = len(question_keywords.intersection(_WORD_RE.findall(content)))
             
             if matches > 0:
-                result["relevance_score"] = matches / len(question_keywords)
-                relevant_results.append(result)
+                # Score a copy: the caller's search results may be shared with other exec calls
+                relevant_results.append(dict(result, relevance_score=matches / keyword_count))
         
-        # Sort by relevance and take top results
-        relevant_results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-        return relevant_results[:10]  # Limit to top 10 relevant results
+        # Take the top 10 by relevance without sorting the whole list
+        return heapq.nlargest(10, relevant_results, key=_relevance_score)
     
     def _format_search_results_for_analysis(self, search_results: List[Dict]) -> str:
         """Format search results for LLM analysis"""
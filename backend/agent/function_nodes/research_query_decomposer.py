@@ -1,6 +1,7 @@
 from pocketflow import Node
 from typing import Dict, List, Any, Optional
 from agent.utils.stream_llm import call_llm
+from agent.utils import json_utils
 import logging
 import json
 
@@ -124,11 +125,11 @@ Ensure each sub-question is:
         
         try:
             logger.info("🤖 ResearchQueryDecomposerNode: Calling LLM for query decomposition")
-            response = call_llm(prompt)
+            response = call_llm(prompt, use_cache=True)
             
             # Extract JSON from response
-            json_str = response.split("```json")[1].split("```")[0].strip()
-            decomposition = json.loads(json_str)
+            json_str = json_utils.fenced_block(response)
+            decomposition = json_utils.loads(json_str)
             
             logger.info("✅ ResearchQueryDecomposerNode: Successfully parsed decomposition")
             
@@ -1,6 +1,7 @@
 from pocketflow import Node
 from typing import Dict, List, Any, Optional
 from agent.utils.stream_llm import call_llm
+from agent.utils import json_utils
 import logging
 import json
 from datetime import datetime
@@ -106,7 +107,7 @@ Output your report in JSON format:
         "research_question": "{main_question}",
         "report_type": "{report_type}",
         "target_audience": "{target_audience}",
-        "generation_date": "{datetime.now().isoformat()}",
+        "generation_date": "{datetime.now().date().isoformat()}",
         "word_count_estimate": 0,
         "section_count": 0,
         "citation_count": 0
@@ -232,11 +233,11 @@ Ensure the report is professional, well-structured, and appropriate for the spec
         
         try:
             logger.info("🤖 ResearchReportGeneratorNode: Calling LLM for report generation")
-            response = call_llm(prompt)
+            response = call_llm(prompt, use_cache=True)
             
             # Extract JSON from response
-            json_str = response.split("```json")[1].split("```")[0].strip()
-            report = json.loads(json_str)
+            json_str = json_utils.fenced_block(response)
+            report = json_utils.loads(json_str)
             
             logger.info("✅ ResearchReportGeneratorNode: Successfully parsed report")
             
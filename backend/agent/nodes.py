@@ -9,95 +9,64 @@ This module contains nodes for the general agent system that can:
 """
 
 import asyncio
+import copy
+import functools
 import json
+import re
+import time
 import yaml
 import logging
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from graphlib import TopologicalSorter
+from typing import Dict, List, Any, Optional, Set, Tuple
 from pocketflow import AsyncNode, Node
 from .utils.stream_llm import stream_llm, call_llm
 from .utils.node_registry import node_registry
 from .utils.workflow_store import workflow_store
 from .utils.permission_manager import permission_manager
 from .utils.node_loader import node_loader
+from .utils.node_cache import node_result_cache
+from .utils.design_cache import design_cache
+from .utils import json_utils
+from .utils.websocket_utils import send_json, safe_send, broadcast, is_disconnected
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-class UserResponseRequiredException(Exception):
-    """Exception raised when a workflow needs user input to continue"""
-    def __init__(self, node_name: str, question: str, node_index: int):
-        self.node_name = node_name
-        self.question = question
-        self.node_index = node_index
-        super().__init__(f"User response required for node {node_name} at index {node_index}")
+# Precompiled scans used by WorkflowOptimizerNode on every feedback loop
+_DISSATISFACTION_RE = re.compile(r"not good|wrong|bad|improve", re.IGNORECASE)
+_ERROR_RE = re.compile(r"error", re.IGNORECASE)
+# Transient failures (HTTP 5xx, rate limits, timeouts) worth a plain retry
+_RETRYABLE_ERROR_RE = re.compile(
+    r"(?:status|http|code)\D{0,3}5\d\d\b|\b5\d\d (?:internal server error|bad gateway|service unavailable|gateway time-?out)"
+    r"|rate.?limit|too many requests|timed? ?out|temporarily unavailable|connection (?:reset|aborted|error)",
+    re.IGNORECASE,
+)
 
-class WorkflowDesignerNode(AsyncNode):
-    """
-    Node that analyzes user questions and designs workflows.
-    Example:
-        >>> node = WorkflowDesignerNode()
-        >>> shared = {"user_message": "Book a flight from LA to Shanghai"}
-        >>> await node.prep_async(shared)
-        # Returns context for LLM to design a workflow
-    """
-    
-    async def prep_async(self, shared):
-        logger.info("🔄 WorkflowDesignerNode: Starting prep_async")
-        
-        # Ensure shared is a dictionary
-        if not isinstance(shared, dict):
-            shared = {}
-            logger.warning("WorkflowDesignerNode: shared parameter is not a dictionary, using empty dict")
-        
-        user_question = shared.get("user_message", "")
-        conversation_history = shared.get("conversation_history", [])
-        websocket = shared.get("websocket")
-        
-        logger.info(f"📝 WorkflowDesignerNode: Processing question: {user_question[:50]}...")
-        logger.info(f"💬 WorkflowDesignerNode: Conversation history length: {len(conversation_history)}")
-        
-        # Get available nodes and similar workflows
-        available_nodes = node_registry.to_dict()
-        similar_workflows = workflow_store.find_similar_workflows(user_question, limit=3)
-        
-        logger.info(f"🔧 WorkflowDesignerNode: Found {len(available_nodes.get('nodes', {}))} available nodes")
-        logger.info(f"💾 WorkflowDesignerNode: Found {len(similar_workflows)} similar workflows")
-        
-        result = {
-            "user_question": user_question,
-            "conversation_history": conversation_history,
-            "websocket": websocket,
-            "available_nodes": available_nodes,
-            "similar_workflows": similar_workflows
-        }
-        
-        logger.info("✅ WorkflowDesignerNode: prep_async completed")
-        return result
-    
-    async def exec_async(self, prep_res):
-        logger.info("🔄 WorkflowDesignerNode: Starting exec_async")
-        
-        user_question = prep_res["user_question"]
-        available_nodes = prep_res["available_nodes"]
-        similar_workflows = prep_res["similar_workflows"]
-        
-        logger.info(f"🤖 WorkflowDesignerNode: Calling LLM to design workflow for: {user_question[:50]}...")
-        
-        # Create prompt for workflow design
-        prompt = f"""
+# Fixed stream envelopes are serialized once
+_STREAM_START_MESSAGE = json_utils.dumps({"type": "start", "content": ""})
+_STREAM_END_MESSAGE = json_utils.dumps({"type": "end", "content": ""})
+# workflow_complete envelope around the serialized results; empty results are fully precomputed
+_WORKFLOW_COMPLETE_PREFIX = '{"type":"workflow_complete","content":{"message":"Workflow completed successfully!","results":'
+_WORKFLOW_COMPLETE_SUFFIX = '}}'
+_WORKFLOW_COMPLETE_EMPTY = _WORKFLOW_COMPLETE_PREFIX + '{}' + _WORKFLOW_COMPLETE_SUFFIX
+# Shared read-only stand-in for a workflow without results
+_EMPTY_RESULTS = MappingProxyType({})
+
+# Prefer libyaml's C loader for LLM responses when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Workflow design prompt, filled in by WorkflowDesignerNode.exec_async
+_DESIGN_PROMPT_TEMPLATE = """
 You are a workflow designer agent. Your task is to analyze the user's question and design a workflow to solve it.
 
 USER QUESTION: {user_question}
 
 AVAILABLE NODES:
-{json.dumps(available_nodes, indent=2)}
+{available_nodes}
 
 SIMILAR WORKFLOWS (for reference):
-{json.dumps([{
-    'description': w.metadata.description,
-    'nodes_used': w.metadata.nodes_used,
-    'success_rate': w.metadata.success_rate
-} for w in similar_workflows], indent=2)}
+{similar_workflows}
 
 Design a workflow to solve the user's question. Consider:
 1. What information do we need to gather?
@@ -142,6 +111,126 @@ requires_permission: <true/false>
 
 IMPORTANT: Use only the available nodes listed above. If you need a node that doesn't exist, use the closest available one or ask for user input.
 """
+
+_DESIGN_REVISION_TEMPLATE = """
+The previous workflow for this question did not satisfy the user. Revise it following this optimization plan:
+{optimization_plan}
+"""
+
+@functools.lru_cache(maxsize=64)
+def _load_yaml_block(response: str) -> Any:
+    yaml_str = response.split("```yaml")[1].split("```")[0].strip()
+    return yaml.load(yaml_str, Loader=_YAML_LOADER)
+
+def _parse_yaml_response(response: str) -> Any:
+    """
+    Parse the ```yaml block of an LLM response. Parses are memoized on the raw
+    response text; callers get their own copy since designs are mutated later.
+    Raises IndexError if there is no yaml block and yaml.YAMLError if it is invalid.
+    """
+    return copy.deepcopy(_load_yaml_block(response))
+
+def warmup():
+    """
+    Pay one-time costs before the first request: build the registry dict the
+    designer prompt uses and exercise the YAML loader and JSON encoder.
+    """
+    json_utils.dumps(node_registry.to_dict())
+    yaml.load("warmup: true", Loader=_YAML_LOADER)
+    logger.info("🔥 Agent nodes warmed up")
+
+class UserResponseRequiredException(Exception):
+    """Exception raised when a workflow needs user input to continue"""
+    def __init__(self, node_name: str, question: str, node_index: int):
+        self.node_name = node_name
+        self.question = question
+        self.node_index = node_index
+        super().__init__(f"User response required for node {node_name} at index {node_index}")
+
+class WorkflowDesignerNode(AsyncNode):
+    """
+    Node that analyzes user questions and designs workflows.
+    Example:
+        >>> node = WorkflowDesignerNode()
+        >>> shared = {"user_message": "Book a flight from LA to Shanghai"}
+        >>> await node.prep_async(shared)
+        # Returns context for LLM to design a workflow
+    """
+    
+    async def prep_async(self, shared: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info("🔄 WorkflowDesignerNode: Starting prep_async")
+        
+        user_question = shared.get("user_message", "")
+        conversation_history = shared.get("conversation_history", [])
+        websocket = shared.get("websocket")
+        
+        logger.info("📝 WorkflowDesignerNode: Processing question: %s...", user_question[:50])
+        logger.info("💬 WorkflowDesignerNode: Conversation history length: %s", len(conversation_history))
+        
+        # Get available nodes and similar workflows
+        available_nodes = node_registry.to_dict()
+        similar_workflows = workflow_store.find_similar_workflows(user_question, limit=3)
+        
+        logger.info("🔧 WorkflowDesignerNode: Found %s available nodes", len(available_nodes.get('nodes', {})))
+        logger.info("💾 WorkflowDesignerNode: Found %s similar workflows", len(similar_workflows))
+        
+        result = {
+            "user_question": user_question,
+            "conversation_history": conversation_history,
+            "websocket": websocket,
+            "available_nodes": available_nodes,
+            "similar_workflows": similar_workflows,
+            "optimization_plan": self._plan_for(shared, user_question)
+        }
+        
+        logger.info("✅ WorkflowDesignerNode: prep_async completed")
+        return result
+    
+    @staticmethod
+    def _plan_for(shared: Dict[str, Any], user_question: str) -> Optional[Dict[str, Any]]:
+        """The optimizer's plan, but only when it was made for this question"""
+        plan = shared.get("optimization_plan")
+        if plan and shared.get("optimization_question") != user_question:
+            logger.info("🧹 WorkflowDesignerNode: Ignoring optimization plan left over from an earlier question")
+            return None
+        return plan
+    
+    async def exec_async(self, prep_res: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info("🔄 WorkflowDesignerNode: Starting exec_async")
+        
+        user_question = prep_res["user_question"]
+        available_nodes = prep_res["available_nodes"]
+        similar_workflows = prep_res["similar_workflows"]
+        
+        # A design only fits the nodes and conversation it was made for
+        cache_context = [available_nodes, prep_res.get("conversation_history", [])]
+        if prep_res.get("optimization_plan"):
+            # The cached design is the one that just failed; a re-design must not get it back
+            design_cache.invalidate(user_question, cache_context)
+        else:
+            cached_design = design_cache.lookup(user_question, cache_context)
+            if cached_design is not None:
+                logger.info("✅ WorkflowDesignerNode: exec_async completed from design cache")
+                return cached_design
+        
+        logger.info("🤖 WorkflowDesignerNode: Calling LLM to design workflow for: %s...", user_question[:50])
+        
+        # Create prompt for workflow design
+        prompt = _DESIGN_PROMPT_TEMPLATE.format(
+            user_question=user_question,
+            available_nodes=json.dumps(available_nodes, indent=2),
+            similar_workflows=json.dumps([{
+                'description': w.metadata.description,
+                'nodes_used': w.metadata.nodes_used,
+                'success_rate': w.metadata.success_rate
+            } for w in similar_workflows], indent=2)
+        )
+        
+        # A re-design must say what to change about the design that fell short
+        if prep_res.get("optimization_plan"):
+            prompt += _DESIGN_REVISION_TEMPLATE.format(
+                optimization_plan=json.dumps(prep_res["optimization_plan"], indent=2, default=str)
+            )
         
         # Get workflow design from LLM
         response = call_llm(prompt)
@@ -149,12 +238,13 @@ IMPORTANT: Use only the available nodes listed above. If you need a node that do
         
         # Parse YAML response with error handling
         try:
-            yaml_str = response.split("```yaml")[1].split("```")[0].strip()
-            workflow_design = yaml.safe_load(yaml_str)
+            workflow_design = _parse_yaml_response(response)
             logger.info("✅ WorkflowDesignerNode: Successfully parsed YAML response")
+            if isinstance(workflow_design, dict) and workflow_design.get("workflow"):
+                design_cache.store(user_question, workflow_design, cache_context)
         except (IndexError, yaml.YAMLError) as e:
-            logger.error(f"❌ WorkflowDesignerNode: Failed to parse YAML response: {e}")
-            logger.error(f"📄 WorkflowDesignerNode: Raw response: {response}")
+            logger.error("❌ WorkflowDesignerNode: Failed to parse YAML response: %s", e)
+            logger.error("📄 WorkflowDesignerNode: Raw response: %s", response)
             # Create a fallback workflow design
             workflow_design = {
                 "thinking": "Failed to parse LLM response, using fallback workflow",
@@ -182,30 +272,30 @@ IMPORTANT: Use only the available nodes listed above. If you need a node that do
             }
             logger.info("🔄 WorkflowDesignerNode: Using fallback workflow design")
         
-        logger.info(f"🎯 WorkflowDesignerNode: Designed workflow '{workflow_design.get('workflow', {}).get('name', 'Unknown')}' with {workflow_design.get('estimated_steps', 0)} steps")
+        logger.info("🎯 WorkflowDesignerNode: Designed workflow '%s' with %s steps", workflow_design.get('workflow', {}).get('name', 'Unknown'), workflow_design.get('estimated_steps', 0))
         logger.info("✅ WorkflowDesignerNode: exec_async completed")
         return workflow_design
     
-    async def post_async(self, shared, prep_res, exec_res):
+    async def post_async(self, shared: Dict[str, Any], prep_res: Dict[str, Any], exec_res: Dict[str, Any]) -> str:
         logger.info("🔄 WorkflowDesignerNode: Starting post_async")
         
         # Store the workflow design
         shared["workflow_design"] = exec_res
         shared["current_workflow"] = exec_res
+        # The plan has been applied; later questions on this connection must not inherit it
+        shared.pop("optimization_plan", None)
+        shared.pop("optimization_question", None)
         
-        logger.info(f"💾 WorkflowDesignerNode: Stored workflow design in shared store")
+        logger.info("💾 WorkflowDesignerNode: Stored workflow design in shared store")
         
         # Send workflow design to user
         websocket = prep_res["websocket"]
         if websocket:
-            try:
-                await websocket.send_text(json.dumps({
-                    "type": "workflow_design",
-                    "content": exec_res
-                }))
+            if await safe_send(websocket, {
+                "type": "workflow_design",
+                "content": exec_res
+            }):
                 logger.info("📤 WorkflowDesignerNode: Sent workflow design to websocket")
-            except Exception as e:
-                logger.error(f"❌ WorkflowDesignerNode: Failed to send workflow design to websocket: {e}")
         else:
             logger.warning("⚠️ WorkflowDesignerNode: No websocket available to send workflow design")
         
@@ -223,15 +313,19 @@ class WorkflowExecutorNode(AsyncNode):
         >>> await node.exec_async(prep_res)
         # Executes workflow nodes in order
     """
-    
-    async def prep_async(self, shared):
+
+    # Nodes that talk to the user; they never share a stage with other nodes
+    INTERACTIVE_NODES = {"user_query", "permission_request"}
+    # Shared keys _execute_workflow_node reads/writes itself before running a node
+    # (question/query auto-fill), on top of whatever the design declares
+    IMPLICIT_KEYS = {
+        "user_query": ({"user_message"}, {"question"}),
+        "web_search": ({"user_message"}, {"query"}),
+    }
+
+    async def prep_async(self, shared: Dict[str, Any]) -> Dict[str, Any]:
         logger.info("🔄 WorkflowExecutorNode: Starting prep_async")
         
-        # Ensure shared is a dictionary
-        if not isinstance(shared, dict):
-            shared = {}
-            logger.warning("WorkflowExecutorNode: shared parameter is not a dictionary, using empty dict")
-        
         workflow_design = shared.get("workflow_design")
         websocket = shared.get("websocket")
         
@@ -239,8 +333,8 @@ class WorkflowExecutorNode(AsyncNode):
             logger.error("❌ WorkflowExecutorNode: No workflow design found")
             raise ValueError("No workflow design found")
         
-        logger.info(f"📋 WorkflowExecutorNode: Found workflow design: {workflow_design.get('workflow', {}).get('name', 'Unknown')}")
-        logger.info(f"🔧 WorkflowExecutorNode: Workflow has {len(workflow_design.get('workflow', {}).get('nodes', []))} nodes")
+        logger.info("📋 WorkflowExecutorNode: Found workflow design: %s", workflow_design.get('workflow', {}).get('name', 'Unknown'))
+        logger.info("🔧 WorkflowExecutorNode: Workflow has %s nodes", len(workflow_design.get('workflow', {}).get('nodes', [])))
         
         result = {
             "workflow_design": workflow_design,
@@ -251,7 +345,7 @@ class WorkflowExecutorNode(AsyncNode):
         logger.info("✅ WorkflowExecutorNode: prep_async completed")
         return result
     
-    async def exec_async(self, prep_res):
+    async def exec_async(self, prep_res: Dict[str, Any]) -> Dict[str, Any]:
         logger.info("🔄 WorkflowExecutorNode: Starting exec_async")
         
         workflow_design = prep_res["workflow_design"]
@@ -259,232 +353,377 @@ class WorkflowExecutorNode(AsyncNode):
         shared = prep_res["shared"]
         nodes = workflow_design["workflow"]["nodes"]
         execution_order = [node["name"] for node in nodes]
+        # Index node configs once; the first node wins for duplicate names
+        nodes_by_name = {}
+        for node in nodes:
+            nodes_by_name.setdefault(node["name"], node)
         
         # 检查是否需要从特定节点继续执行
         start_index = shared.get("current_node_index", 0)
         if start_index > 0:
-            logger.info(f"🔄 WorkflowExecutorNode: Resuming from node index {start_index}")
+            logger.info("🔄 WorkflowExecutorNode: Resuming from node index %s", start_index)
         
-        logger.info(f"🚀 WorkflowExecutorNode: Starting execution of {len(nodes)} nodes from index {start_index}")
-        logger.info(f"📋 WorkflowExecutorNode: Execution order: {execution_order}")
+        logger.info("🚀 WorkflowExecutorNode: Starting execution of %s nodes from index %s", len(nodes), start_index)
+        logger.info("📋 WorkflowExecutorNode: Execution order: %s", execution_order)
         results = {}
         
-        for i, node_name in enumerate(execution_order):
-            # 如果从特定索引开始，跳过之前的节点
-            if i < start_index:
-                logger.info(f"⏭️ WorkflowExecutorNode: Skipping node {i}: {node_name}")
+        # The optimizer asks for a delayed re-run after transient node failures
+        retry_delay = shared.pop("retry_delay", 0)
+        if retry_delay:
+            logger.info("⏳ WorkflowExecutorNode: Backing off %.1fs before retrying workflow", retry_delay)
+            await asyncio.sleep(retry_delay)
+        
+        for i in range(min(start_index, len(nodes))):
+            logger.info("⏭️ WorkflowExecutorNode: Skipping node %s: %s", i, nodes[i]['name'])
+
+        for stage in self._plan_execution_stages(workflow_design["workflow"], start_index):
+            if len(stage) == 1:
+                await self._execute_workflow_node(stage[0], nodes, nodes_by_name, workflow_design, websocket, shared, results)
                 continue
-                
-            node_config = next(n for n in nodes if n["name"] == node_name)
-            logger.info(f"⚡ WorkflowExecutorNode: Executing node {i+1}/{len(execution_order)}: {node_name}")
-            logger.info(f"📝 WorkflowExecutorNode: Node description: {node_config.get('description', 'No description')}")
-            
-            # --- BEGIN PATCH: user_query question improvement ---
-            if node_name == "user_query":
-                # Try to generate a meaningful question
-                question = None
-                # Prefer explicit question in node_config
-                if "question" in node_config and node_config["question"]:
-                    question = node_config["question"]
-                # Otherwise, use description to form a question
-                elif node_config.get("description"):
-                    question = node_config["description"]
-                # If still no question, try to compose from inputs
+            logger.info("🔀 WorkflowExecutorNode: Running %s independent nodes concurrently: %s", len(stage), [nodes[i]['name'] for i in stage])
+            # Let every sibling finish before raising, so no executor thread is still writing to shared
+            outcomes = await asyncio.gather(
+                *(self._execute_workflow_node(i, nodes, nodes_by_name, workflow_design, websocket, shared, results) for i in stage),
+                return_exceptions=True
+            )
+            failures = [(i, outcome) for i, outcome in zip(stage, outcomes) if isinstance(outcome, BaseException)]
+            for i, error in failures:
+                logger.error("❌ WorkflowExecutorNode: Concurrent node %s failed: %r", nodes[i]['name'], error)
+            if failures:
+                # Surface the first node failure just like sequential execution would
+                raise failures[0][1]
+
+        logger.info("🎉 WorkflowExecutorNode: All %s nodes completed successfully", len(execution_order))
+        logger.info("✅ WorkflowExecutorNode: exec_async completed")
+        return results
+
+    async def _execute_workflow_node(self, i: int, nodes: List[Dict[str, Any]], nodes_by_name: Dict[str, Dict[str, Any]], workflow_design: Dict[str, Any], websocket: Any, shared: Dict[str, Any], results: Dict[str, Any]) -> None:
+        """Execute the i-th workflow node and record its result in ``results``."""
+        node_name = nodes[i]["name"]
+        node_config = nodes_by_name[node_name]
+        logger.info("⚡ WorkflowExecutorNode: Executing node %s/%s: %s", i+1, len(nodes), node_name)
+        logger.info("📝 WorkflowExecutorNode: Node description: %s", node_config.get('description', 'No description'))
+        
+        # --- BEGIN PATCH: user_query question improvement ---
+        if node_name == "user_query":
+            # Try to generate a meaningful question
+            question = None
+            # Prefer explicit question in node_config
+            if "question" in node_config and node_config["question"]:
+                question = node_config["question"]
+            # Otherwise, use description to form a question
+            elif node_config.get("description"):
+                question = node_config["description"]
+            # If still no question, try to compose from inputs
+            elif node_config.get("inputs"):
+                # Compose a question from inputs
+                inputs = node_config["inputs"]
+                if isinstance(inputs, list) and len(inputs) > 0:
+                    question = f"Please provide the following information: {', '.join(inputs)}"
+            # If no meaningful question found, raise an error
+            if not question:
+                raise ValueError(f"UserQueryNode '{node_name}' has no meaningful question. Node config: {node_config}")
+            shared["question"] = question
+            logger.info("🔧 WorkflowExecutorNode: Set question for user_query node: '%s'", question)
+        # --- END PATCH ---
+
+        # --- BEGIN PATCH: web_search query auto-fill ---
+        if node_name == "web_search":
+            if not shared.get("query"):
+                # 优先用 shared["user_message"]
+                if shared.get("user_message"):
+                    shared["query"] = shared["user_message"]
+                # 其次用 workflow_design["user_question"]
+                elif workflow_design.get("user_question"):
+                    shared["query"] = workflow_design["user_question"]
+                # 兼容 workflow 节点 inputs 字段
                 elif node_config.get("inputs"):
-                    # Compose a question from inputs
-                    inputs = node_config["inputs"]
-                    if isinstance(inputs, list) and len(inputs) > 0:
-                        question = f"Please provide the following information: {', '.join(inputs)}"
-                # If no meaningful question found, raise an error
-                if not question:
-                    raise ValueError(f"UserQueryNode '{node_name}' has no meaningful question. Node config: {node_config}")
-                shared["question"] = question
-                logger.info(f"🔧 WorkflowExecutorNode: Set question for user_query node: '{question}'")
-            # --- END PATCH ---
-
-            # --- BEGIN PATCH: web_search query auto-fill ---
-            if node_name == "web_search":
-                if not shared.get("query"):
-                    # 优先用 shared["user_message"]
-                    if shared.get("user_message"):
-                        shared["query"] = shared["user_message"]
-                    # 其次用 workflow_design["user_question"]
-                    elif workflow_design.get("user_question"):
-                        shared["query"] = workflow_design["user_question"]
-                    # 兼容 workflow 节点 inputs 字段
-                    elif node_config.get("inputs"):
-                        for input_key in node_config["inputs"]:
-                            if shared.get(input_key):
-                                shared["query"] = shared[input_key]
-                                break
-                logger.info(f"🔧 WorkflowExecutorNode: Set query for web_search node: '{shared.get('query')}'")
-            # --- END PATCH ---
+                    for input_key in node_config["inputs"]:
+                        if shared.get(input_key):
+                            shared["query"] = shared[input_key]
+                            break
+            logger.info("🔧 WorkflowExecutorNode: Set query for web_search node: '%s'", shared.get('query'))
+        # --- END PATCH ---
 
-            if websocket:
-                try:
-                    await websocket.send_text(json.dumps({
-                        "type": "workflow_progress",
-                        "content": {
-                            "current_node": node_name,
-                            "description": node_config["description"],
-                            "progress": f"{i+1}/{len(execution_order)}"
-                        }
-                    }))
-                    logger.info(f"📤 WorkflowExecutorNode: Sent progress update for {node_name}")
-                except Exception as e:
-                    logger.error(f"❌ WorkflowExecutorNode: Failed to send progress update: {e}")
-            
-            try:
-                # Get node metadata from registry
-                node_metadata = node_registry.get_node(node_name)
-                if not node_metadata:
-                    logger.warning(f"⚠️ WorkflowExecutorNode: No metadata found for {node_name}, returning mock result")
+        if websocket:
+            if await safe_send(websocket, {
+                "type": "workflow_progress",
+                "content": {
+                    "current_node": node_name,
+                    "description": node_config.get("description", ""),
+                    "progress": f"{i+1}/{len(nodes)}"
+                }
+            }):
+                logger.info("📤 WorkflowExecutorNode: Sent progress update for %s", node_name)
+        
+        try:
+            # Get node metadata from registry
+            node_metadata = node_registry.get_node(node_name)
+            if not node_metadata:
+                logger.warning("⚠️ WorkflowExecutorNode: No metadata found for %s, returning mock result", node_name)
+                result = f"Mock result for {node_name}"
+            else:
+                # Get the shared node instance from the dynamic loader
+                node_instance = node_loader.get_node_instance({
+                    "name": node_name,
+                    "module_path": node_metadata.module_path,
+                    "class_name": node_metadata.class_name
+                })
+                
+                if node_instance is None:
+                    logger.warning("⚠️ WorkflowExecutorNode: Failed to create instance for %s, returning mock result", node_name)
                     result = f"Mock result for {node_name}"
                 else:
-                    # Create node instance using dynamic loader
-                    node_instance = node_loader.create_node_instance({
-                        "module_path": node_metadata.module_path,
-                        "class_name": node_metadata.class_name
-                    })
-                    
-                    if node_instance is None:
-                        logger.warning(f"⚠️ WorkflowExecutorNode: Failed to create instance for {node_name}, returning mock result")
-                        result = f"Mock result for {node_name}"
-                    else:
-                        # Execute the node
-                        prep_res_node = node_instance.prep(shared)
-                        result = node_instance.exec(prep_res_node)
-                        action = node_instance.post(shared, prep_res_node, result)
+                    # Execute the node
+                    prep_res_node, result, action = await self._run_function_node(
+                        node_instance, shared, cache_name=node_name if node_metadata.cacheable else None
+                    )
+
+                    # Special handling for user_query node
+                    if node_name == "user_query" and action == "wait_for_response":
+                        logger.info("⏳ WorkflowExecutorNode: User query node requires response, pausing execution")
                         
-                        # Special handling for user_query node
-                        if node_name == "user_query" and action == "wait_for_response":
-                            logger.info("⏳ WorkflowExecutorNode: User query node requires response, pausing execution")
-                            
-                            # Send question to user via websocket
-                            if websocket:
-                                try:
-                                    await websocket.send_text(json.dumps({
-                                        "type": "user_question",
-                                        "content": {
-                                            "question": prep_res_node,
-                                            "requires_response": True
-                                        }
-                                    }))
-                                    logger.info("📤 WorkflowExecutorNode: Sent user question via websocket")
-                                except Exception as e:
-                                    logger.error(f"❌ WorkflowExecutorNode: Failed to send user question: {e}")
-                            
-                            # Check if this is a demo environment (DemoWebSocket)
-                            is_demo = hasattr(websocket, 'get_auto_response')
-                            
-                            if is_demo:
-                                logger.info("🎭 WorkflowExecutorNode: Demo environment detected, using auto-response")
-                                # Get auto response from demo websocket
-                                auto_response = websocket.get_auto_response(prep_res_node)
-                                shared["user_response"] = auto_response
-                                shared["waiting_for_user_response"] = False
-                                logger.info(f"🤖 WorkflowExecutorNode: Auto response: {auto_response[:50]}...")
-                            else:
-                                # 在生产环境中，我们暂停执行并等待服务器重新启动流程
-                                logger.info("⏸️ WorkflowExecutorNode: Pausing execution, waiting for server to resume")
-                                shared["waiting_for_user_response"] = True
-                                shared["current_node_index"] = i  # 保存当前节点索引
-                                shared["current_node_name"] = node_name
-                                
-                                # 抛出特殊异常来暂停执行
-                                raise UserResponseRequiredException(
-                                    node_name=node_name,
-                                    question=prep_res_node,
-                                    node_index=i
-                                )
-                            
-                            # Get the user response
-                            user_response = shared.get("user_response", "")
-                            logger.info(f"✅ WorkflowExecutorNode: Received user response: {user_response[:50]}...")
-                            
-                            # Update the result with user response
-                            result = user_response
-                            shared[f"{node_name}_result"] = user_response
-                            
-                            # Clear the waiting flag
-                            shared["waiting_for_user_response"] = False
-                            shared["user_response"] = None
+                        # Send question to user via websocket
+                        if websocket:
+                            if await safe_send(websocket, {
+                                "type": "user_question",
+                                "content": {
+                                    "question": prep_res_node,
+                                    "requires_response": True
+                                }
+                            }):
+                                logger.info("📤 WorkflowExecutorNode: Sent user question via websocket")
                         
-                        # Special handling for permission_request node
-                        elif node_name == "permission_request" and action == "wait_for_permission":
-                            logger.info("⏳ WorkflowExecutorNode: Permission request node requires response, pausing execution")
-                            
-                            # Wait for permission response
-                            waiting_logged = False
-                            while shared.get("waiting_for_permission", False):
-                                if not waiting_logged:
-                                    logger.info("⏳ WorkflowExecutorNode: Waiting for permission response...")
-                                    waiting_logged = True
-                                await asyncio.sleep(0.1)
-                            
-                            # Get the permission response
-                            permission_response = shared.get("permission_response", {})
-                            logger.info(f"✅ WorkflowExecutorNode: Received permission response: {permission_response}")
-                            
-                            # Update the result with permission response
-                            result = permission_response
-                            shared[f"{node_name}_result"] = permission_response
+                        # Check if this is a demo environment (DemoWebSocket)
+                        is_demo = hasattr(websocket, 'get_auto_response')
+                        
+                        if is_demo:
+                            logger.info("🎭 WorkflowExecutorNode: Demo environment detected, using auto-response")
+                            # Get auto response from demo websocket
+                            auto_response = websocket.get_auto_response(prep_res_node)
+                            shared["user_response"] = auto_response
+                            shared["waiting_for_user_response"] = False
+                            logger.info("🤖 WorkflowExecutorNode: Auto response: %s...", auto_response[:50])
+                        else:
+                            # 在生产环境中，我们暂停执行并等待服务器重新启动流程
+                            logger.info("⏸️ WorkflowExecutorNode: Pausing execution, waiting for server to resume")
+                            shared["waiting_for_user_response"] = True
+                            shared["current_node_index"] = i  # 保存当前节点索引
+                            shared["current_node_name"] = node_name
                             
-                            # Clear the waiting flag
-                            shared["waiting_for_permission"] = False
-                            shared["permission_response"] = None
-                
-                results[node_name] = result
-                logger.info(f"✅ WorkflowExecutorNode: Node {node_name} completed successfully")
-                
-                if websocket:
-                    try:
-                        await websocket.send_text(json.dumps({
-                            "type": "node_complete",
-                            "content": {
-                                "node": node_name,
-                                "result": result
-                            }
-                        }))
-                        logger.info(f"📤 WorkflowExecutorNode: Sent completion message for {node_name}")
-                    except Exception as e:
-                        logger.error(f"❌ WorkflowExecutorNode: Failed to send completion message: {e}")
+                            # 抛出特殊异常来暂停执行
+                            raise UserResponseRequiredException(
+                                node_name=node_name,
+                                question=prep_res_node,
+                                node_index=i
+                            )
                         
-            except UserResponseRequiredException as e:
-                # 这是预期的异常，用于暂停执行
-                logger.info(f"⏸️ WorkflowExecutorNode: Paused for user response: {e}")
-                # 清除当前节点索引，因为我们已经处理了这个异常
-                shared.pop("current_node_index", None)
-                shared.pop("current_node_name", None)
-                raise  # 重新抛出异常，让上层处理
-                
-            except Exception as e:
-                logger.error(f"❌ WorkflowExecutorNode: Node {node_name} failed with error: {e}")
-                if websocket:
-                    try:
-                        await websocket.send_text(json.dumps({
-                            "type": "node_error",
-                            "content": {
-                                "node": node_name,
-                                "error": str(e)
-                            }
-                        }))
-                        logger.info(f"📤 WorkflowExecutorNode: Sent error message for {node_name}")
-                    except Exception as send_error:
-                        logger.error(f"❌ WorkflowExecutorNode: Failed to send error message: {send_error}")
-                raise
-        
-        logger.info(f"🎉 WorkflowExecutorNode: All {len(execution_order)} nodes completed successfully")
-        logger.info("✅ WorkflowExecutorNode: exec_async completed")
-        return results
-    
-    async def post_async(self, shared, prep_res, exec_res):
+                        # Get the user response
+                        user_response = shared.get("user_response", "")
+                        logger.info("✅ WorkflowExecutorNode: Received user response: %s...", user_response[:50])
+                        
+                        # Update the result with user response
+                        result = user_response
+                        shared[f"{node_name}_result"] = user_response
+                        
+                        # Clear the waiting flag
+                        shared["waiting_for_user_response"] = False
+                        shared["user_response"] = None
+                    
+                    # Special handling for permission_request node
+                    elif node_name == "permission_request" and action == "wait_for_permission":
+                        logger.info("⏳ WorkflowExecutorNode: Permission request node requires response, pausing execution")
+                        
+                        # Wait for permission response
+                        waiting_logged = False
+                        while shared.get("waiting_for_permission", False):
+                            if not waiting_logged:
+                                logger.info("⏳ WorkflowExecutorNode: Waiting for permission response...")
+                                waiting_logged = True
+                            await asyncio.sleep(0.1)
+                        
+                        # Get the permission response
+                        permission_response = shared.get("permission_response", {})
+                        logger.info("✅ WorkflowExecutorNode: Received permission response: %s", permission_response)
+                        
+                        # Update the result with permission response
+                        result = permission_response
+                        shared[f"{node_name}_result"] = permission_response
+                        
+                        # Clear the waiting flag
+                        shared["waiting_for_permission"] = False
+                        shared["permission_response"] = None
+            
+            results[node_name] = result
+            logger.info("✅ WorkflowExecutorNode: Node %s completed successfully", node_name)
+            
+            if websocket:
+                if await safe_send(websocket, {
+                    "type": "node_complete",
+                    "content": {
+                        "node": node_name,
+                        "result": result
+                    }
+                }):
+                    logger.info("📤 WorkflowExecutorNode: Sent completion message for %s", node_name)
+                    
+        except UserResponseRequiredException as e:
+            # 这是预期的异常，用于暂停执行
+            logger.info("⏸️ WorkflowExecutorNode: Paused for user response: %s", e)
+            # 清除当前节点索引，因为我们已经处理了这个异常
+            shared.pop("current_node_index", None)
+            shared.pop("current_node_name", None)
+            raise  # 重新抛出异常，让上层处理
+            
+        except Exception as e:
+            logger.error("❌ WorkflowExecutorNode: Node %s failed with error: %s", node_name, e)
+            if websocket:
+                if await safe_send(websocket, {
+                    "type": "node_error",
+                    "content": {
+                        "node": node_name,
+                        "error": str(e)
+                    }
+                }):
+                    logger.info("📤 WorkflowExecutorNode: Sent error message for %s", node_name)
+            raise
+
+    def _plan_execution_stages(self, workflow: Dict[str, Any], start_index: int = 0) -> List[List[int]]:
+        """
+        Group the workflow nodes (by index) into stages that can run concurrently.
+
+        Dependencies come from the declared connections plus every read/write
+        conflict (read-after-write, write-after-write and write-after-read)
+        between the nodes' declared inputs and outputs, counting the keys the
+        executor fills in itself (IMPLICIT_KEYS); only forward edges (earlier index
+        -> later index) are kept so the graph is always acyclic. A run of nodes is
+        only parallelized when every node in it declares both key lists and appears
+        in a connection, otherwise the list order is the only dependency
+        information we can trust and it runs sequentially. Interactive nodes run
+        alone, which keeps pause/resume by node index exact.
+        """
+        nodes = workflow.get("nodes", [])
+        pending = list(range(start_index, len(nodes)))
+        connections = workflow.get("connections") or []
+        if not connections:
+            return [[i] for i in pending]
+
+        indices_by_name: Dict[str, List[int]] = {}
+        for i, node in enumerate(nodes):
+            indices_by_name.setdefault(node["name"], []).append(i)
+        connected = set()
+        for edge in connections:
+            connected.add(edge.get("from"))
+            connected.add(edge.get("to"))
+
+        dependencies = {i: set() for i in pending}
+        for edge in connections:
+            for src in indices_by_name.get(edge.get("from"), []):
+                for dst in indices_by_name.get(edge.get("to"), []):
+                    if start_index <= src < dst:
+                        dependencies[dst].add(src)
+        keys = {i: self._declared_keys(nodes[i]) for i in pending}
+        for dst in pending:
+            if keys[dst] is None:
+                continue
+            dst_inputs, dst_outputs = keys[dst]
+            for src in range(start_index, dst):
+                if keys[src] is None:
+                    continue
+                src_inputs, src_outputs = keys[src]
+                if src_outputs & (dst_inputs | dst_outputs) or src_inputs & dst_outputs:
+                    dependencies[dst].add(src)
+
+        def plan_segment(segment: List[int]) -> List[List[int]]:
+            if all(keys[i] is not None and nodes[i]["name"] in connected for i in segment):
+                return self._topological_levels(segment, dependencies)
+            return [[i] for i in segment]
+
+        stages = []
+        segment = []
+        for i in pending:
+            if nodes[i]["name"] in self.INTERACTIVE_NODES:
+                stages.extend(plan_segment(segment))
+                stages.append([i])
+                segment = []
+            else:
+                segment.append(i)
+        stages.extend(plan_segment(segment))
+        return stages
+
+    @classmethod
+    def _declared_keys(cls, node: Dict[str, Any]) -> Optional[Tuple[Set[str], Set[str]]]:
+        """A node's (inputs, outputs) key sets plus the executor's implicit ones, or None unless both are declared as lists"""
+        inputs, outputs = node.get("inputs"), node.get("outputs")
+        if not isinstance(inputs, list) or not isinstance(outputs, list):
+            return None
+        implicit_inputs, implicit_outputs = cls.IMPLICIT_KEYS.get(node["name"], (set(), set()))
+        return set(inputs) | implicit_inputs, set(outputs) | implicit_outputs
+
+    @staticmethod
+    def _topological_levels(segment: List[int], dependencies: Dict[int, Set[int]]) -> List[List[int]]:
+        """Split a segment of node indices into ready-sets using graphlib"""
+        members = set(segment)
+        sorter = TopologicalSorter({i: dependencies[i] & members for i in segment})
+        sorter.prepare()
+        levels = []
+        while sorter.is_active():
+            ready = sorted(sorter.get_ready())
+            levels.append(ready)
+            sorter.done(*ready)
+        return levels
+
+    async def _run_function_node(self, node_instance: Node, shared: Dict[str, Any], cache_name: Optional[str] = None) -> Tuple[Any, Any, Any]:
+        """
+        Run a function node's prep/exec/post without blocking the event loop.
+        Async nodes are awaited directly; sync nodes (web search, LLM calls, etc.)
+        run in the default executor so websocket sends keep flowing meanwhile.
+        When cache_name is given, exec is memoized on a hash of the prep result;
+        post always runs so the node still writes its outputs to shared.
+        """
+        is_async = isinstance(node_instance, AsyncNode)
+        loop = asyncio.get_running_loop()
+        if is_async:
+            prep_res_node = await node_instance.prep_async(shared)
+        else:
+            prep_res_node = await loop.run_in_executor(None, node_instance.prep, shared)
+
+        cache_key = node_result_cache.make_key(cache_name, prep_res_node) if cache_name else None
+        hit, result = node_result_cache.get(cache_key) if cache_key else (False, None)
+        if hit:
+            logger.info("♻️ WorkflowExecutorNode: Reusing cached result for %s", cache_name)
+        else:
+            if is_async:
+                result = await node_instance.exec_async(prep_res_node)
+            else:
+                result = await loop.run_in_executor(None, node_instance.exec, prep_res_node)
+            if cache_key and self._is_reusable_result(result):
+                node_result_cache.set(cache_key, result)
+
+        if is_async:
+            action = await node_instance.post_async(shared, prep_res_node, result)
+        else:
+            action = await loop.run_in_executor(None, node_instance.post, shared, prep_res_node, result)
+        return prep_res_node, result, action
+
+    @staticmethod
+    def _is_reusable_result(result: Any) -> bool:
+        """Empty results and error payloads are never memoized"""
+        if not result:
+            return False
+        if isinstance(result, dict) and "error" in result:
+            return False
+        if isinstance(result, str) and result.startswith("Error"):
+            return False
+        return True
+
+    async def post_async(self, shared: Dict[str, Any], prep_res: Dict[str, Any], exec_res: Dict[str, Any]) -> str:
         logger.info("🔄 WorkflowExecutorNode: Starting post_async")
         
         # Store workflow results
         shared["workflow_results"] = exec_res
         
-        logger.info(f"💾 WorkflowExecutorNode: Stored {len(exec_res)} workflow results in shared store")
+        logger.info("💾 WorkflowExecutorNode: Stored %s workflow results in shared store", len(exec_res))
         
         # Save successful workflow to store
         workflow_design = prep_res["workflow_design"]
@@ -528,20 +767,15 @@ class UserInteractionNode(AsyncNode):
         # Sends question to user via websocket
     """
     
-    async def prep_async(self, shared):
+    async def prep_async(self, shared: Dict[str, Any]) -> Dict[str, Any]:
         logger.info("🔄 UserInteractionNode: Starting prep_async")
         
-        # Ensure shared is a dictionary
-        if not isinstance(shared, dict):
-            shared = {}
-            logger.warning("UserInteractionNode: shared parameter is not a dictionary, using empty dict")
-        
         websocket = shared.get("websocket")
         pending_question = shared.get("pending_user_question")
         pending_permission = shared.get("pending_permission_request")
         
-        logger.info(f"❓ UserInteractionNode: Pending question: {pending_question is not None}")
-        logger.info(f"🔐 UserInteractionNode: Pending permission: {pending_permission is not None}")
+        logger.info("❓ UserInteractionNode: Pending question: %s", pending_question is not None)
+        logger.info("🔐 UserInteractionNode: Pending permission: %s", pending_permission is not None)
         
         result = {
             "websocket": websocket,
@@ -552,7 +786,7 @@ class UserInteractionNode(AsyncNode):
         logger.info("✅ UserInteractionNode: prep_async completed")
         return result
     
-    async def exec_async(self, prep_res):
+    async def exec_async(self, prep_res: Dict[str, Any]) -> Dict[str, Any]:
         logger.info("🔄 UserInteractionNode: Starting exec_async")
         
         websocket = prep_res["websocket"]
@@ -560,20 +794,17 @@ class UserInteractionNode(AsyncNode):
         pending_permission = prep_res["pending_permission"]
         
         if pending_question:
-            logger.info(f"❓ UserInteractionNode: Sending question to user: {pending_question[:50]}...")
+            logger.info("❓ UserInteractionNode: Sending question to user: %s...", pending_question[:50])
             # Send question to user
             if websocket:
-                try:
-                    await websocket.send_text(json.dumps({
-                        "type": "user_question",
-                        "content": {
-                            "question": pending_question,
-                            "requires_response": True
-                        }
-                    }))
+                if await safe_send(websocket, {
+                    "type": "user_question",
+                    "content": {
+                        "question": pending_question,
+                        "requires_response": True
+                    }
+                }):
                     logger.info("📤 UserInteractionNode: Sent question to websocket")
-                except Exception as e:
-                    logger.error(f"❌ UserInteractionNode: Failed to send question: {e}")
             
             # Wait for user response (in real implementation, this would be handled differently)
             result = {"type": "question", "question": pending_question}
@@ -581,20 +812,17 @@ class UserInteractionNode(AsyncNode):
             return result
         
         elif pending_permission:
-            logger.info(f"🔐 UserInteractionNode: Processing permission request: {pending_permission}")
+            logger.info("🔐 UserInteractionNode: Processing permission request: %s", pending_permission)
             # Send permission request to user
             request = permission_manager.get_request(pending_permission)
             if request:
                 formatted_request = permission_manager.format_permission_request_for_user(request)
                 if websocket:
-                    try:
-                        await websocket.send_text(json.dumps({
-                            "type": "permission_request",
-                            "content": formatted_request
-                        }))
+                    if await safe_send(websocket, {
+                        "type": "permission_request",
+                        "content": formatted_request
+                    }):
                         logger.info("📤 UserInteractionNode: Sent permission request to websocket")
-                    except Exception as e:
-                        logger.error(f"❌ UserInteractionNode: Failed to send permission request: {e}")
                 result = {"type": "permission", "request_id": pending_permission}
                 logger.info("✅ UserInteractionNode: Permission request sent")
                 return result
@@ -602,11 +830,11 @@ class UserInteractionNode(AsyncNode):
         logger.info("✅ UserInteractionNode: No pending interactions")
         return {"type": "none"}
     
-    async def post_async(self, shared, prep_res, exec_res):
+    async def post_async(self, shared: Dict[str, Any], prep_res: Dict[str, Any], exec_res: Dict[str, Any]) -> str:
         logger.info("🔄 UserInteractionNode: Starting post_async")
         
         interaction_type = exec_res["type"]
-        logger.info(f"🔄 UserInteractionNode: Processing interaction type: {interaction_type}")
+        logger.info("🔄 UserInteractionNode: Processing interaction type: %s", interaction_type)
         
         if interaction_type == "question":
             # Store that we're waiting for user response
@@ -634,32 +862,32 @@ class WorkflowOptimizerNode(AsyncNode):
         >>> await node.exec_async(prep_res)
         # Suggests improvements if needed
     """
+
+    # Transient single-node failures are retried this many times before asking the LLM
+    MAX_RETRY_ATTEMPTS = 3
+    RETRY_BASE_DELAY = 1.0  # seconds, doubled on every attempt
     
-    async def prep_async(self, shared):
+    async def prep_async(self, shared: Dict[str, Any]) -> Dict[str, Any]:
         logger.info("🔄 WorkflowOptimizerNode: Starting prep_async")
         
-        # Ensure shared is a dictionary
-        if not isinstance(shared, dict):
-            shared = {}
-            logger.warning("WorkflowOptimizerNode: shared parameter is not a dictionary, using empty dict")
-        
         workflow_results = shared.get("workflow_results", {})
         user_feedback = shared.get("user_feedback", "")
         original_workflow = shared.get("workflow_design")
         
-        logger.info(f"📊 WorkflowOptimizerNode: Analyzing {len(workflow_results)} workflow results")
-        logger.info(f"💬 WorkflowOptimizerNode: User feedback length: {len(user_feedback)}")
+        logger.info("📊 WorkflowOptimizerNode: Analyzing %s workflow results", len(workflow_results))
+        logger.info("💬 WorkflowOptimizerNode: User feedback length: %s", len(user_feedback))
         
         result = {
             "workflow_results": workflow_results,
             "user_feedback": user_feedback,
-            "original_workflow": original_workflow
+            "original_workflow": original_workflow,
+            "retry_attempt": shared.get("retry_attempt", 0)
         }
         
         logger.info("✅ WorkflowOptimizerNode: prep_async completed")
         return result
     
-    async def exec_async(self, prep_res):
+    async def exec_async(self, prep_res: Dict[str, Any]) -> Dict[str, Any]:
         logger.info("🔄 WorkflowOptimizerNode: Starting exec_async")
         
         workflow_results = prep_res["workflow_results"]
@@ -669,36 +897,52 @@ class WorkflowOptimizerNode(AsyncNode):
         # Analyze if workflow needs optimization
         optimization_needed = False
         optimization_reasons = []
+        failed_nodes = []
         
         logger.info("🔍 WorkflowOptimizerNode: Analyzing workflow results for optimization needs")
         
         # Check for errors in results
         for node_name, result in workflow_results.items():
-            if isinstance(result, str) and "error" in result.lower():
+            if isinstance(result, str) and _ERROR_RE.search(result):
                 optimization_needed = True
+                failed_nodes.append(node_name)
                 optimization_reasons.append(f"Error in {node_name}: {result}")
-                logger.warning(f"⚠️ WorkflowOptimizerNode: Found error in {node_name}: {result}")
+                logger.warning("⚠️ WorkflowOptimizerNode: Found error in %s: %s", node_name, result)
         
         # Check user feedback for dissatisfaction
-        if user_feedback and any(word in user_feedback.lower() for word in ["not good", "wrong", "bad", "improve"]):
+        if user_feedback and _DISSATISFACTION_RE.search(user_feedback):
             optimization_needed = True
             optimization_reasons.append(f"User feedback indicates dissatisfaction: {user_feedback}")
-            logger.info(f"💬 WorkflowOptimizerNode: User feedback indicates dissatisfaction: {user_feedback}")
+            logger.info("💬 WorkflowOptimizerNode: User feedback indicates dissatisfaction: %s", user_feedback)
+        
+        # A single transient node failure is retried as-is without an LLM round-trip
+        if (len(optimization_reasons) == 1 and failed_nodes
+                and _RETRYABLE_ERROR_RE.search(workflow_results[failed_nodes[0]])
+                and prep_res["retry_attempt"] < self.MAX_RETRY_ATTEMPTS):
+            logger.info("🔁 WorkflowOptimizerNode: Retryable error in %s, retrying workflow with backoff", failed_nodes[0])
+            return {
+                "optimization_needed": True,
+                "strategy": "retry_with_backoff",
+                "issues": optimization_reasons,
+                "retry_nodes": failed_nodes,
+                "revised_workflow": original_workflow
+            }
         
         if optimization_needed:
             logger.info("🔧 WorkflowOptimizerNode: Optimization needed, calling LLM for suggestions")
-            # Create optimization prompt
+            # Create optimization prompt from a trimmed view of the workflow and results
+            workflow_summary, results_summary = self._summarize_for_prompt(original_workflow, workflow_results, failed_nodes)
             prompt = f"""
 The workflow execution had issues that need optimization:
 
 ORIGINAL WORKFLOW:
-{json.dumps(original_workflow, indent=2)}
+{json_utils.dumps(workflow_summary)}
 
 ISSUES FOUND:
 {chr(10).join(optimization_reasons)}
 
 WORKFLOW RESULTS:
-{json.dumps(workflow_results, indent=2)}
+{json_utils.dumps(results_summary)}
 
 USER FEEDBACK:
 {user_feedback}
@@ -721,8 +965,7 @@ revised_workflow:
 """
             
             response = call_llm(prompt)
-            yaml_str = response.split("```yaml")[1].split("```")[0].strip()
-            optimization_plan = yaml.safe_load(yaml_str)
+            optimization_plan = _parse_yaml_response(response)
             
             logger.info("✅ WorkflowOptimizerNode: Generated optimization plan")
             return optimization_plan
@@ -730,25 +973,55 @@ revised_workflow:
             logger.info("✅ WorkflowOptimizerNode: No optimization needed, workflow executed successfully")
             return {"optimization_needed": False, "message": "Workflow executed successfully"}
     
-    async def post_async(self, shared, prep_res, exec_res):
+    @staticmethod
+    def _summarize_for_prompt(original_workflow: Optional[Dict[str, Any]], workflow_results: Dict[str, Any], failed_nodes: List[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Project the workflow and its results down to what the optimizer needs:
+        node names/descriptions and connections, plus the error text of failed
+        nodes. Full result payloads are left out of the prompt.
+        """
+        workflow = (original_workflow or {}).get("workflow", {})
+        workflow_summary = {
+            "name": workflow.get("name"),
+            "nodes": [
+                {"name": node.get("name"), "description": node.get("description")}
+                for node in workflow.get("nodes", [])
+            ],
+            "connections": workflow.get("connections", [])
+        }
+        results_summary = {
+            node_name: workflow_results[node_name] if node_name in failed_nodes else "completed"
+            for node_name in workflow_results
+        }
+        return workflow_summary, results_summary
+    
+    async def post_async(self, shared: Dict[str, Any], prep_res: Dict[str, Any], exec_res: Dict[str, Any]) -> str:
         logger.info("🔄 WorkflowOptimizerNode: Starting post_async")
         
+        if exec_res.get("strategy") == "retry_with_backoff":
+            attempt = shared.get("retry_attempt", 0)
+            shared["retry_attempt"] = attempt + 1
+            shared["retry_delay"] = self.RETRY_BASE_DELAY * (2 ** attempt)
+            # Re-run the whole design from the first node
+            shared.pop("current_node_index", None)
+            logger.info("✅ WorkflowOptimizerNode: Returning 'retry_workflow' (attempt %s)", attempt + 1)
+            return "retry_workflow"
+        
+        shared.pop("retry_attempt", None)
         if exec_res.get("optimization_needed", False):
             logger.info("🔧 WorkflowOptimizerNode: Optimization needed, storing plan and sending suggestions")
             # Store optimization plan
             shared["optimization_plan"] = exec_res
+            shared["optimization_question"] = shared.get("user_message", "")
             
             # Send optimization suggestions to user
             websocket = shared.get("websocket")
             if websocket:
-                try:
-                    await websocket.send_text(json.dumps({
-                        "type": "optimization_suggestions",
-                        "content": exec_res
-                    }))
+                if await safe_send(websocket, {
+                    "type": "optimization_suggestions",
+                    "content": exec_res
+                }):
                     logger.info("📤 WorkflowOptimizerNode: Sent optimization suggestions to websocket")
-                except Exception as e:
-                    logger.error(f"❌ WorkflowOptimizerNode: Failed to send optimization suggestions: {e}")
             
             logger.info("✅ WorkflowOptimizerNode: Returning 'optimize_workflow'")
             return "optimize_workflow"
@@ -770,53 +1043,63 @@ class StreamingChatNode(AsyncNode):
         >>> await node.exec_async(prep_res)
         # Streams LLM response to websocket
     """
+
+    # Buffered chunks are flushed once they reach 4 KiB or 10 ms have passed
+    FLUSH_SIZE = 4096
+    FLUSH_INTERVAL = 0.01
     
-    async def prep_async(self, shared):
+    async def prep_async(self, shared: Dict[str, Any]) -> Tuple[List[Dict[str, str]], Any]:
         logger.info("🔄 StreamingChatNode: Starting prep_async")
         
-        # Ensure shared is a dictionary
-        if not isinstance(shared, dict):
-            shared = {}
-            logger.warning("StreamingChatNode: shared parameter is not a dictionary, using empty dict")
-        
         user_message = shared.get("user_message", "")
         websocket = shared.get("websocket")
         
         conversation_history = shared.get("conversation_history", [])
         conversation_history.append({"role": "user", "content": user_message})
         
-        logger.info(f"💬 StreamingChatNode: Processing message: {user_message[:50]}...")
-        logger.info(f"📚 StreamingChatNode: Conversation history length: {len(conversation_history)}")
+        logger.info("💬 StreamingChatNode: Processing message: %s...", user_message[:50])
+        logger.info("📚 StreamingChatNode: Conversation history length: %s", len(conversation_history))
         
         result = conversation_history, websocket
         logger.info("✅ StreamingChatNode: prep_async completed")
         return result
     
-    async def exec_async(self, prep_res):
+    async def exec_async(self, prep_res: Tuple[List[Dict[str, str]], Any]) -> Tuple[str, Any]:
         logger.info("🔄 StreamingChatNode: Starting exec_async")
         
         messages, websocket = prep_res
         
         logger.info("📤 StreamingChatNode: Sending start message")
-        await websocket.send_text(json.dumps({"type": "start", "content": ""}))
+        await send_json(websocket, _STREAM_START_MESSAGE)
         
         logger.info("🤖 StreamingChatNode: Starting LLM streaming")
-        full_response = ""
+        chunks = []
+        pending = []
+        pending_size = 0
+        last_flush = time.monotonic()
         async for chunk_content in stream_llm(messages):
-            full_response += chunk_content
-            await websocket.send_text(json.dumps({
-                "type": "chunk", 
-                "content": chunk_content
-            }))
+            chunks.append(chunk_content)
+            pending.append(chunk_content)
+            pending_size += len(chunk_content)
+            # Coalesce tiny token deltas so each frame carries a useful payload
+            now = time.monotonic()
+            if pending_size >= self.FLUSH_SIZE or now - last_flush >= self.FLUSH_INTERVAL:
+                await send_json(websocket, {"type": "chunk", "content": "".join(pending)})
+                pending.clear()
+                pending_size = 0
+                last_flush = now
+        if pending:
+            await send_json(websocket, {"type": "chunk", "content": "".join(pending)})
+        full_response = "".join(chunks)
         
         logger.info("📤 StreamingChatNode: Sending end message")
-        await websocket.send_text(json.dumps({"type": "end", "content": ""}))
+        await send_json(websocket, _STREAM_END_MESSAGE)
         
-        logger.info(f"✅ StreamingChatNode: Generated response length: {len(full_response)}")
+        logger.info("✅ StreamingChatNode: Generated response length: %s", len(full_response))
         logger.info("✅ StreamingChatNode: exec_async completed")
         return full_response, websocket
     
-    async def post_async(self, shared, prep_res, exec_res):
+    async def post_async(self, shared: Dict[str, Any], prep_res: Tuple[List[Dict[str, str]], Any], exec_res: Tuple[str, Any]) -> None:
         logger.info("🔄 StreamingChatNode: Starting post_async")
         
         full_response, websocket = exec_res
@@ -840,58 +1123,65 @@ class WorkflowEndNode(AsyncNode):
         # Sends completion message to websocket
     """
     
-    async def prep_async(self, shared):
-        logger.info("🔄 WorkflowEndNode: Starting prep_async")
+    async def prep_async(self, shared: Dict[str, Any]) -> Tuple[Any, Any, Dict[str, Any]]:
+        logger.debug("🔄 WorkflowEndNode: Starting prep_async")
         
-        # Ensure shared is a dictionary
-        if not isinstance(shared, dict):
-            shared = {}
-            logger.warning("WorkflowEndNode: shared parameter is not a dictionary, using empty dict")
-        
-        websocket = shared.get("websocket")
-        workflow_results = shared.get("workflow_results", {})
+        workflow_results = shared.get("workflow_results") or _EMPTY_RESULTS
+        logger.debug("📊 WorkflowEndNode: Workflow has %d results", len(workflow_results))
         
-        logger.info(f"📊 WorkflowEndNode: Workflow has {len(workflow_results)} results")
-        
-        result = {
-            "websocket": websocket,
-            "workflow_results": workflow_results
-        }
-        
-        logger.info("✅ WorkflowEndNode: prep_async completed")
-        return result
+        logger.debug("✅ WorkflowEndNode: prep_async completed")
+        return shared.get("websocket"), shared.get("ws_batcher"), workflow_results
     
-    async def exec_async(self, prep_res):
-        logger.info("🔄 WorkflowEndNode: Starting exec_async")
+    async def exec_async(self, prep_res: Tuple[Any, Any, Dict[str, Any]]) -> str:
+        logger.debug("🔄 WorkflowEndNode: Starting exec_async")
         
         # Send completion message
-        websocket = prep_res["websocket"]
-        if websocket:
-            try:
-                await websocket.send_text(json.dumps({
-                    "type": "workflow_complete",
-                    "content": {
-                        "message": "Workflow completed successfully!",
-                        "results": prep_res["workflow_results"]
-                    }
-                }))
-                logger.info("📤 WorkflowEndNode: Sent workflow completion message to websocket")
-            except Exception as e:
-                logger.error(f"❌ WorkflowEndNode: Failed to send workflow completion message: {e}")
+        websocket, batcher, workflow_results = prep_res
+        # shared["websocket"] may hold one client or a collection of subscribers
+        if not isinstance(websocket, (set, frozenset, list, tuple)):
+            websocket = (websocket,) if websocket else ()
+        clients = [client for client in websocket if not is_disconnected(client)]
+        if batcher and is_disconnected(batcher.websocket):
+            batcher = None
+        
+        # Skip serializing the results when nobody is left to receive them
+        if not batcher and not clients:
+            logger.warning("⚠️ WorkflowEndNode: No connected websocket to send completion message")
+            message = None
         else:
-            logger.warning("⚠️ WorkflowEndNode: No websocket available to send completion message")
+            try:
+                message = self._completion_message(workflow_results)
+            except (TypeError, ValueError) as e:
+                logger.error("❌ WorkflowEndNode: Workflow results are not JSON serializable: %s", e)
+                message = None
+        
+        if message is not None:
+            if batcher:
+                # The connection's batcher coalesces this with other queued messages
+                await batcher.enqueue(message)
+                logger.debug("📤 WorkflowEndNode: Queued workflow completion message")
+            else:
+                delivered = await broadcast(clients, message)
+                logger.debug("📤 WorkflowEndNode: Sent workflow completion message to %d/%d websockets", delivered, len(clients))
         
         result = "Workflow completed successfully"
-        logger.info("✅ WorkflowEndNode: exec_async completed")
+        logger.debug("✅ WorkflowEndNode: exec_async completed")
         return result
     
-    async def post_async(self, shared, prep_res, exec_res):
-        logger.info("🔄 WorkflowEndNode: Starting post_async")
+    @staticmethod
+    def _completion_message(workflow_results: Dict[str, Any]) -> str:
+        """Serialize the workflow_complete message, splicing results into the cached envelope"""
+        if not workflow_results:
+            return _WORKFLOW_COMPLETE_EMPTY
+        return _WORKFLOW_COMPLETE_PREFIX + json_utils.dumps(workflow_results) + _WORKFLOW_COMPLETE_SUFFIX
+    
+    async def post_async(self, shared: Dict[str, Any], prep_res: Tuple[Any, Any, Dict[str, Any]], exec_res: str) -> None:
+        logger.debug("🔄 WorkflowEndNode: Starting post_async")
         
         # Mark workflow as complete
         shared["workflow_complete"] = True
         shared["workflow_status"] = "success"
         
-        logger.info("✅ WorkflowEndNode: Marked workflow as complete")
+        logger.debug("✅ WorkflowEndNode: Marked workflow as complete")
         logger.info("🎉 WorkflowEndNode: Workflow execution finished successfully")
         return None  # End the flow 
\ No newline at end of file
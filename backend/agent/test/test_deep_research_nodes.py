@@ -1,7 +1,8 @@
+import sys
+import threading
 import unittest
-from unittest.mock import Mock, patch, MagicMock
-import json
-from datetime import datetime
+import pytest
+from unittest.mock import patch
 
 # Import the nodes to test
 from agent.function_nodes.research_query_decomposer import ResearchQueryDecomposerNode
@@ -14,9 +15,7 @@ from agent.function_nodes.research_report_generator import ResearchReportGenerat
 class TestResearchQueryDecomposerNode(unittest.TestCase):
     """Test cases for ResearchQueryDecomposerNode"""
     
-    def setUp(self):
-        self.node = ResearchQueryDecomposerNode()
-        self.mock_llm_response = """
+    MOCK_LLM_RESPONSE = """
 ```json
 {
     "main_question": "How is AI transforming healthcare?",
@@ -61,6 +60,10 @@ class TestResearchQueryDecomposerNode(unittest.TestCase):
 ```
 """
     
+    @classmethod
+    def setUpClass(cls):
+        cls.node = ResearchQueryDecomposerNode()
+    
     def test_prep_method(self):
         """Test the prep method extracts correct data from shared store"""
         shared = {
@@ -88,7 +91,7 @@ class TestResearchQueryDecomposerNode(unittest.TestCase):
     @patch('agent.function_nodes.research_query_decomposer.call_llm')
     def test_exec_method_success(self, mock_llm):
         """Test successful execution of query decomposition"""
-        mock_llm.return_value = self.mock_llm_response
+        mock_llm.return_value = self.MOCK_LLM_RESPONSE
         
         inputs = ("How is AI transforming healthcare?", "comprehensive", {})
         result = self.node.exec(inputs)
@@ -99,17 +102,6 @@ class TestResearchQueryDecomposerNode(unittest.TestCase):
         self.assertIn("research_strategy", result)
         self.assertEqual(len(result["sub_questions"]), 2)
     
-    @patch('agent.function_nodes.research_query_decomposer.call_llm')
-    def test_exec_with_empty_question(self, mock_llm):
-        """Test execution with empty research question"""
-        inputs = ("", "standard", {})
-        result = self.node.exec(inputs)
-        
-        self.assertIsInstance(result, dict)
-        self.assertEqual(result["status"], "empty_question")
-        self.assertEqual(len(result["sub_questions"]), 0)
-        mock_llm.assert_not_called()
-    
     @patch('agent.function_nodes.research_query_decomposer.call_llm')
     def test_exec_llm_failure(self, mock_llm):
         """Test fallback behavior when LLM parsing fails"""
@@ -145,9 +137,7 @@ class TestResearchQueryDecomposerNode(unittest.TestCase):
 class TestMultiSourceInformationGathererNode(unittest.TestCase):
     """Test cases for MultiSourceInformationGathererNode"""
     
-    def setUp(self):
-        self.node = MultiSourceInformationGathererNode()
-        self.mock_llm_response = """
+    MOCK_LLM_RESPONSE = """
 ```json
 {
     "sub_question_id": "q1",
@@ -202,6 +192,10 @@ class TestMultiSourceInformationGathererNode(unittest.TestCase):
 ```
 """
     
+    @classmethod
+    def setUpClass(cls):
+        cls.node = MultiSourceInformationGathererNode()
+    
     def test_prep_method(self):
         """Test the prep method extracts correct data"""
         shared = {
@@ -219,7 +213,7 @@ class TestMultiSourceInformationGathererNode(unittest.TestCase):
     @patch('agent.function_nodes.multi_source_information_gatherer.call_llm')
     def test_exec_method_success(self, mock_llm):
         """Test successful information gathering"""
-        mock_llm.return_value = self.mock_llm_response
+        mock_llm.return_value = self.MOCK_LLM_RESPONSE
         
         sub_question = {"id": "q1", "question": "Test question"}
         search_results = [{"title": "Test", "url": "test.com", "snippet": "AI medical diagnosis"}]
@@ -233,17 +227,27 @@ class TestMultiSourceInformationGathererNode(unittest.TestCase):
         self.assertIn("source_analysis", result)
         self.assertGreater(len(result["information_gathered"]["key_findings"]), 0)
     
-    def test_exec_no_relevant_results(self):
-        """Test execution when no relevant search results found"""
-        sub_question = {"id": "q1", "question": "Test question"}
-        search_results = []
-        inputs = (sub_question, ["web"], search_results, {})
+    @patch('agent.function_nodes.multi_source_information_gatherer.call_llm')
+    def test_exec_batch_overlaps_llm_calls(self, mock_llm):
+        """Test batch gathering runs the LLM calls concurrently and keeps input order"""
+        # Every call blocks until all of them are in flight, so a serial batch times out
+        in_flight = threading.Barrier(4, timeout=5)
         
-        result = self.node.exec(inputs)
+        def slow_llm(*args, **kwargs):
+            in_flight.wait()
+            return self.MOCK_LLM_RESPONSE
+        mock_llm.side_effect = slow_llm
         
-        self.assertIsInstance(result, dict)
-        self.assertEqual(result["status"], "no_relevant_results")
-        self.assertEqual(len(result["information_gathered"]["key_findings"]), 0)
+        # One result list shared by every sub-question, as in the demo's shared store
+        search_results = [{"title": "Test", "url": "test.com", "snippet": "AI medical diagnosis"}]
+        inputs_list = [({"id": f"q{i}", "question": f"Test question {i}"}, ["web"], search_results, {}) for i in range(4)]
+        
+        results = self.node.exec_batch(inputs_list)
+        
+        self.assertEqual([r["sub_question_id"] for r in results], ["q0", "q1", "q2", "q3"])
+        self.assertEqual(search_results, [{"title": "Test", "url": "test.com", "snippet": "AI medical diagnosis"}])
+        self.assertEqual(mock_llm.call_count, 4)
+        self.assertEqual(self.node.exec_batch([]), [])
     
     def test_extract_relevant_search_results(self):
         """Test relevance filtering of search results"""
@@ -258,6 +262,7 @@ class TestMultiSourceInformationGathererNode(unittest.TestCase):
         
         self.assertEqual(len(relevant), 2)  # Should filter out cooking recipes
         self.assertTrue(all(result.get("relevance_score", 0) > 0 for result in relevant))
+        self.assertFalse(any("relevance_score" in result for result in search_results))  # inputs left untouched
     
     def test_post_method(self):
         """Test post method updates research queue correctly"""
@@ -276,9 +281,7 @@ class TestMultiSourceInformationGathererNode(unittest.TestCase):
 class TestInformationSynthesizerNode(unittest.TestCase):
     """Test cases for InformationSynthesizerNode"""
     
-    def setUp(self):
-        self.node = InformationSynthesizerNode()
-        self.mock_llm_response = """
+    MOCK_LLM_RESPONSE = """
 ```json
 {
     "main_question": "How is AI transforming healthcare?",
@@ -371,6 +374,10 @@ class TestInformationSynthesizerNode(unittest.TestCase):
 ```
 """
     
+    @classmethod
+    def setUpClass(cls):
+        cls.node = InformationSynthesizerNode()
+    
     def test_prep_method(self):
         """Test prep method extracts synthesis data correctly"""
         shared = {
@@ -390,7 +397,7 @@ class TestInformationSynthesizerNode(unittest.TestCase):
     @patch('agent.function_nodes.information_synthesizer.call_llm')
     def test_exec_method_success(self, mock_llm):
         """Test successful synthesis execution"""
-        mock_llm.return_value = self.mock_llm_response
+        mock_llm.return_value = self.MOCK_LLM_RESPONSE
         
         research_findings = {
             "q1": {
@@ -409,16 +416,6 @@ class TestInformationSynthesizerNode(unittest.TestCase):
         self.assertIn("key_insights", result)
         self.assertGreater(len(result["key_insights"]), 0)
     
-    def test_exec_empty_findings(self):
-        """Test execution with no research findings"""
-        inputs = ({}, {}, "Test question?", {})
-        
-        result = self.node.exec(inputs)
-        
-        self.assertIsInstance(result, dict)
-        self.assertEqual(result["status"], "empty_findings")
-        self.assertEqual(len(result["key_insights"]), 0)
-    
     def test_structure_research_findings(self):
         """Test research findings structuring for LLM"""
         research_findings = {
@@ -464,9 +461,7 @@ class TestInformationSynthesizerNode(unittest.TestCase):
 class TestCitationManagerNode(unittest.TestCase):
     """Test cases for CitationManagerNode"""
     
-    def setUp(self):
-        self.node = CitationManagerNode()
-        self.mock_llm_response = """
+    MOCK_LLM_RESPONSE = """
 ```json
 {
     "citation_style": "apa",
@@ -535,6 +530,10 @@ class TestCitationManagerNode(unittest.TestCase):
 ```
 """
     
+    @classmethod
+    def setUpClass(cls):
+        cls.node = CitationManagerNode()
+    
     def test_prep_method(self):
         """Test prep method extracts citation data correctly"""
         shared = {
@@ -553,7 +552,7 @@ class TestCitationManagerNode(unittest.TestCase):
     @patch('agent.function_nodes.citation_manager.call_llm')
     def test_exec_method_success(self, mock_llm):
         """Test successful citation generation"""
-        mock_llm.return_value = self.mock_llm_response
+        mock_llm.return_value = self.MOCK_LLM_RESPONSE
         
         research_findings = {
             "q1": {
@@ -572,16 +571,6 @@ class TestCitationManagerNode(unittest.TestCase):
         self.assertIn("citation_database", result)
         self.assertGreater(len(result["citation_database"]), 0)
     
-    def test_exec_no_sources(self):
-        """Test execution when no sources are available"""
-        inputs = ({}, [], {}, "apa", {})
-        
-        result = self.node.exec(inputs)
-        
-        self.assertIsInstance(result, dict)
-        self.assertEqual(result["status"], "no_sources")
-        self.assertEqual(len(result["citation_database"]), 0)
-    
     def test_extract_all_sources(self):
         """Test source extraction from research findings and search results"""
         research_findings = {
@@ -627,9 +616,7 @@ class TestCitationManagerNode(unittest.TestCase):
 class TestResearchReportGeneratorNode(unittest.TestCase):
     """Test cases for ResearchReportGeneratorNode"""
     
-    def setUp(self):
-        self.node = ResearchReportGeneratorNode()
-        self.mock_llm_response = """
+    MOCK_LLM_RESPONSE = """
 ```json
 {
     "report_metadata": {
@@ -716,6 +703,10 @@ class TestResearchReportGeneratorNode(unittest.TestCase):
 ```
 """
     
+    @classmethod
+    def setUpClass(cls):
+        cls.node = ResearchReportGeneratorNode()
+    
     def test_prep_method(self):
         """Test prep method sets up report configuration correctly"""
         shared = {
@@ -745,7 +736,7 @@ class TestResearchReportGeneratorNode(unittest.TestCase):
     @patch('agent.function_nodes.research_report_generator.call_llm')
     def test_exec_method_success(self, mock_llm):
         """Test successful report generation"""
-        mock_llm.return_value = self.mock_llm_response
+        mock_llm.return_value = self.MOCK_LLM_RESPONSE
         
         research_synthesis = {
             "synthesis_overview": {"primary_answer": "AI is transforming healthcare"},
@@ -765,16 +756,6 @@ class TestResearchReportGeneratorNode(unittest.TestCase):
         self.assertIn("report_sections", result)
         self.assertGreater(len(result["report_sections"]), 0)
     
-    def test_exec_no_synthesis(self):
-        """Test execution when no synthesis data is available"""
-        inputs = ({}, {}, {}, {"report_type": "brief"}, "Test question?")
-        
-        result = self.node.exec(inputs)
-        
-        self.assertIsInstance(result, dict)
-        self.assertEqual(result["status"], "insufficient_data")
-        self.assertEqual(len(result["report_sections"]), 1)  # Only notice section
-    
     def test_prepare_citation_lookup(self):
         """Test citation lookup preparation"""
         citations = {
@@ -859,21 +840,48 @@ class TestResearchReportGeneratorNode(unittest.TestCase):
         self.assertIn("### Background", formatted)
 
 
+# Every node short-circuits on empty input with a status result and must not
+# reach the LLM; one case per node instead of a near-identical method each
+EARLY_EXIT_CASES = [
+    pytest.param("research_query_decomposer", ResearchQueryDecomposerNode,
+                 ("", "standard", {}),
+                 "empty_question", ("sub_questions",), 0, id="decomposer-empty-question"),
+    pytest.param("multi_source_information_gatherer", MultiSourceInformationGathererNode,
+                 ({"id": "q1", "question": "Test question"}, ["web"], [], {}),
+                 "no_relevant_results", ("information_gathered", "key_findings"), 0, id="gatherer-no-results"),
+    pytest.param("information_synthesizer", InformationSynthesizerNode,
+                 ({}, {}, "Test question?", {}),
+                 "empty_findings", ("key_insights",), 0, id="synthesizer-empty-findings"),
+    pytest.param("citation_manager", CitationManagerNode,
+                 ({}, [], {}, "apa", {}),
+                 "no_sources", ("citation_database",), 0, id="citations-no-sources"),
+    pytest.param("research_report_generator", ResearchReportGeneratorNode,
+                 ({}, {}, {}, {"report_type": "brief"}, "Test question?"),
+                 "insufficient_data", ("report_sections",), 1, id="report-no-synthesis"),  # Only notice section
+]
+
+
+@pytest.mark.parametrize("module,node_cls,inputs,expected_status,items_path,expected_items", EARLY_EXIT_CASES)
+def test_exec_early_exit(module, node_cls, inputs, expected_status, items_path, expected_items):
+    """Test execution when there is nothing to work on"""
+    with patch(f"agent.function_nodes.{module}.call_llm") as mock_llm:
+        result = node_cls().exec(inputs)
+
+    assert isinstance(result, dict)
+    assert result["status"] == expected_status
+    items = result
+    for key in items_path:
+        items = items[key]
+    assert len(items) == expected_items
+    mock_llm.assert_not_called()
+
+
+@pytest.mark.integration
 class TestDeepResearchWorkflowIntegration(unittest.TestCase):
     """Integration tests for the complete deep research workflow"""
     
-    def setUp(self):
-        self.decomposer = ResearchQueryDecomposerNode()
-        self.gatherer = MultiSourceInformationGathererNode()
-        self.synthesizer = InformationSynthesizerNode()
-        self.citation_manager = CitationManagerNode()
-        self.report_generator = ResearchReportGeneratorNode()
-    
-    @patch('agent.function_nodes.research_query_decomposer.call_llm')
-    def test_decomposer_to_gatherer_workflow(self, mock_llm):
-        """Test workflow from decomposer to gatherer"""
-        # Mock decomposer response with exactly 1 sub-question
-        mock_llm.return_value = """
+    # Mock decomposer response with exactly 1 sub-question
+    MOCK_DECOMPOSER_RESPONSE = """
 ```json
 {
     "main_question": "Test question",
@@ -884,6 +892,19 @@ class TestDeepResearchWorkflowIntegration(unittest.TestCase):
 }
 ```
 """
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.decomposer = ResearchQueryDecomposerNode()
+        cls.gatherer = MultiSourceInformationGathererNode()
+        cls.synthesizer = InformationSynthesizerNode()
+        cls.citation_manager = CitationManagerNode()
+        cls.report_generator = ResearchReportGeneratorNode()
+    
+    @patch('agent.function_nodes.research_query_decomposer.call_llm')
+    def test_decomposer_to_gatherer_workflow(self, mock_llm):
+        """Test workflow from decomposer to gatherer"""
+        mock_llm.return_value = self.MOCK_DECOMPOSER_RESPONSE
         
         # Simulate shared store
         shared = {"research_question": "Test question", "research_depth": "standard"}
@@ -993,5 +1014,4 @@ class TestDeepResearchWorkflowIntegration(unittest.TestCase):
 
 
 if __name__ == "__main__":
-    # Run individual test classes
-    unittest.main(verbosity=2)
\ No newline at end of file
+    sys.exit(pytest.main([__file__, "-q"]))
\ No newline at end of file
@@ -1,20 +1,13 @@
 #!/usr/bin/env python3
 """
-Simplified test runner for deep research nodes.
-Can be run directly without pytest or complex imports.
+Simplified tests for deep research nodes.
+Run with pytest, or as a module (python -m agent.test.test_deep_research_simple
+from the backend directory) to run it through pytest.main.
 """
 
 import sys
-import os
-import json
-from datetime import datetime
-from unittest.mock import Mock, patch
-
-# Add the workspace root directory to the path to find pocketflow
-workspace_root = os.path.join(os.path.dirname(__file__), '../../..')
-sys.path.insert(0, workspace_root)
-# Add the backend directory to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+import pytest
+from unittest.mock import patch
 
 # Import nodes directly
 from agent.function_nodes.research_query_decomposer import ResearchQueryDecomposerNode
@@ -562,30 +555,5 @@ def test_workflow_integration():
     
     print("🎉 Workflow Integration: ALL TESTS PASSED\n")
 
-def main():
-    """Run all tests"""
-    print("🚀 Starting Deep Research Nodes Test Suite\n")
-    print("=" * 60)
-    
-    try:
-        test_research_query_decomposer()
-        test_multi_source_information_gatherer()
-        test_information_synthesizer()
-        test_citation_manager()
-        test_research_report_generator()
-        test_workflow_integration()
-        
-        print("=" * 60)
-        print("🎉 ALL TESTS PASSED! Deep Research Nodes are working correctly.")
-        print("✅ Ready for production use!")
-        
-    except Exception as e:
-        print(f"❌ Test failed with error: {e}")
-        import traceback
-        traceback.print_exc()
-        return 1
-    
-    return 0
-
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,103 @@
+import asyncio
+import agent.nodes
+from agent.nodes import WorkflowDesignerNode, WorkflowOptimizerNode
+from agent.utils.design_cache import DesignCache
+
+
+DESIGN = {"workflow": {"name": "Flight Search", "nodes": [{"name": "web_search"}]}}
+
+
+def test_lookup_returns_design_for_same_question():
+    cache = DesignCache()
+    cache.store("Find cheap flights from LA to Shanghai next week", DESIGN)
+    hit = cache.lookup("  find cheap flights from LA to\tShanghai   next week ")
+    assert hit == DESIGN
+    assert hit is not DESIGN
+
+
+def test_lookup_misses_for_different_question():
+    cache = DesignCache()
+    cache.store("Find cheap flights from LA to Shanghai", DESIGN)
+    assert cache.lookup("Summarize the latest research on protein folding") is None
+
+
+def test_lookup_misses_when_only_the_entity_differs():
+    cache = DesignCache()
+    cache.store("What were the main drivers of Tesla stock price changes over the last fiscal year", DESIGN)
+    assert cache.lookup("What were the main drivers of Apple stock price changes over the last fiscal year") is None
+
+
+def test_lookup_misses_for_different_context():
+    cache = DesignCache()
+    context = [{"nodes": {"web_search": {}}}, []]
+    cache.store("Find cheap flights", DESIGN, context)
+    assert cache.lookup("Find cheap flights", context) == DESIGN
+    assert cache.lookup("Find cheap flights", [{"nodes": {"web_search": {}}}, [{"role": "user", "content": "I live in LA"}]]) is None
+    assert cache.lookup("Find cheap flights", [{"nodes": {}}, []]) is None
+
+
+def test_invalidate_drops_a_failed_design():
+    cache = DesignCache()
+    cache.store("Find cheap flights", DESIGN)
+    cache.invalidate("find cheap flights")
+    assert cache.lookup("Find cheap flights") is None
+
+
+def test_store_keeps_only_the_newest_entries():
+    cache = DesignCache(max_entries=2)
+    cache.store("first question", DESIGN)
+    cache.store("second question", DESIGN)
+    cache.store("third question", DESIGN)
+    assert len(cache) == 2
+    assert cache.lookup("first question") is None
+
+
+DESIGN_REPLY = "```yaml\nworkflow:\n  name: Search\n  nodes:\n    - name: web_search\n  connections: []\n```"
+
+
+def _design(shared):
+    async def run():
+        node = WorkflowDesignerNode()
+        prep_res = await node.prep_async(shared)
+        await node.post_async(shared, prep_res, await node.exec_async(prep_res))
+    asyncio.run(run())
+
+
+def test_designer_cache_still_hits_after_another_question_was_optimized(monkeypatch):
+    """An optimize loop for one question never turns the cache off for the next one"""
+    prompts = []
+
+    def fake_llm(prompt):
+        prompts.append(prompt)
+        return DESIGN_REPLY
+
+    monkeypatch.setattr(agent.nodes, "call_llm", fake_llm)
+    shared = {"user_message": "Summarize today's AI news", "conversation_history": []}
+    _design(shared)
+
+    shared["user_message"] = "Find cheap flights to Tokyo"
+    _design(shared)
+    plan = {"optimization_needed": True, "issues": ["too few results"]}
+    asyncio.run(WorkflowOptimizerNode().post_async(shared, {}, plan))
+    _design(shared)
+    assert len(prompts) == 3
+
+    shared["user_message"] = "Summarize today's AI news"
+    _design(shared)
+    assert len(prompts) == 3
+
+
+def test_designer_ignores_a_plan_left_for_another_question(monkeypatch):
+    """A stale plan (e.g. the re-design failed before post) neither revises nor bypasses the cache"""
+    prompts = []
+    monkeypatch.setattr(agent.nodes, "call_llm", lambda prompt: prompts.append(prompt) or DESIGN_REPLY)
+    shared = {"user_message": "Summarize today's AI news", "conversation_history": []}
+    _design(shared)
+
+    shared["optimization_plan"] = {"optimization_needed": True}
+    shared["optimization_question"] = "Find cheap flights to Tokyo"
+    prep_res = asyncio.run(WorkflowDesignerNode().prep_async(shared))
+
+    assert prep_res["optimization_plan"] is None
+    assert asyncio.run(WorkflowDesignerNode().exec_async(prep_res))["workflow"]["name"] == "Search"
+    assert len(prompts) == 1
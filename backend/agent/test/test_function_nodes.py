@@ -1,6 +1,6 @@
-import os
 import pytest
-import importlib
+import requests
+from types import MappingProxyType
 
 from agent.function_nodes.firecrawl_scrape import FirecrawlScrapeNode
 from agent.function_nodes.data_formatter import DataFormatterNode
@@ -15,7 +15,6 @@ def test_firecrawl_scrape(monkeypatch):
     shared = {"url": "https://example.com"}
     monkeypatch.setenv("FIRECRAWL_API_KEY", "dummy-key")
     # Mock requests.post
-    import requests
     class DummyResp:
         def raise_for_status(self): pass
         def json(self): return {"markdown": "# Title", "json": {"title": "Title"}}
@@ -37,26 +36,23 @@ def test_data_formatter():
     node.post(shared, prep_res, result)
 
 # --- PermissionRequestNode ---
-def test_permission_request_infer_type():
-    node = PermissionRequestNode()
-    shared = {"operation": "access database", "details": "Read user table"}
-    prep_res = node.prep(shared)
-    assert prep_res[0] == "data_access"  # inferred type
-    result = node.exec(prep_res)
-    assert isinstance(result, str)
-    assert "Permission required: [DATA_ACCESS]" in result
-    assert "Request ID:" in result
-    node.post(shared, prep_res, result)
-    assert "pending_permission_request" in shared
-    assert shared["waiting_for_permission"] is True
+# Read-only so a node writing to a case's input fails loudly; tests run on a copy
+PERMISSION_CASES = [
+    # Type inferred from the operation
+    (MappingProxyType({"operation": "access database", "details": "Read user table"}), "data_access"),
+    # Type given explicitly
+    (MappingProxyType({"operation": "external API call", "details": "Send data to third-party service", "permission_type": "external_api"}), "external_api"),
+]
 
-def test_permission_request_explicit_type():
+@pytest.mark.parametrize("shared,expected_type", PERMISSION_CASES)
+def test_permission_request(shared, expected_type):
     node = PermissionRequestNode()
-    shared = {"operation": "external API call", "details": "Send data to third-party service", "permission_type": "external_api"}
+    shared = dict(shared)
     prep_res = node.prep(shared)
-    assert prep_res[0] == "external_api"  # explicit type
+    assert prep_res[0] == expected_type
     result = node.exec(prep_res)
-    assert "Permission required: [EXTERNAL_API]" in result
+    assert isinstance(result, str)
+    assert f"Permission required: [{expected_type.upper()}]" in result
     assert "Request ID:" in result
     node.post(shared, prep_res, result)
     assert "pending_permission_request" in shared
@@ -86,9 +82,6 @@ def test_result_summarizer(monkeypatch):
 
 # --- WebSearchNode ---
 def test_web_search(monkeypatch):
-    if importlib.util.find_spec("duckduckgo_search") is None:
-        pytest.skip("duckduckgo_search not installed")
-    
     # Mock DDGS to avoid rate limiting issues
     class MockDDGS:
         def text(self, query, max_results=None):
@@ -97,9 +90,10 @@ def test_web_search(monkeypatch):
                 {"title": "GPT-4 Features", "body": "Advanced AI capabilities", "href": "https://example.com/gpt4"}
             ][:max_results]
     
-    # Patch the DDGS import in web_search module
-    import agent.function_nodes.web_search
-    monkeypatch.setattr(agent.function_nodes.web_search, "DDGS", MockDDGS)
+    # Patch the DDGS import in web_search module; the stub also stands in when
+    # duckduckgo_search is not installed, so the test never needs the package or network
+    monkeypatch.setattr("agent.function_nodes.web_search.DDGS", MockDDGS, raising=False)
+    monkeypatch.setattr("agent.function_nodes.web_search.DDGS_AVAILABLE", True)
     
     node = WebSearchNode()
     shared = {"query": "OpenAI GPT-4", "num_results": 2}
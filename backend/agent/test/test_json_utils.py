@@ -0,0 +1,51 @@
+import datetime
+import uuid
+from dataclasses import dataclass
+
+import pytest
+from agent.utils import json_utils
+
+
+@dataclass
+class Source:
+    url: str
+    fetched_at: datetime.datetime
+
+
+RESULTS = {
+    "source": Source("https://example.com", datetime.datetime(2024, 1, 2, 3, 4, 5)),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "day": datetime.date(2024, 1, 2),
+}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_encodes_rich_types_on_both_backends(monkeypatch, use_orjson):
+    if use_orjson and not json_utils.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(json_utils, "ORJSON_AVAILABLE", use_orjson)
+    assert json_utils.loads(json_utils.dumps(RESULTS)) == {
+        "source": {"url": "https://example.com", "fetched_at": "2024-01-02T03:04:05"},
+        "id": "12345678-1234-5678-1234-567812345678",
+        "day": "2024-01-02",
+    }
+
+
+def test_dumps_rejects_unknown_types_without_orjson(monkeypatch):
+    monkeypatch.setattr(json_utils, "ORJSON_AVAILABLE", False)
+    with pytest.raises(TypeError):
+        json_utils.dumps({"value": object()})
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('Here you go:\n```json\n{"a": 1}\n```\nDone', '{"a": 1}'),
+    ('```json\n{"a": 1}', '{"a": 1}'),
+    ('```yaml\nkey: value\n```\n```json\n[]\n```', '[]'),
+])
+def test_fenced_block_extracts_first_json_block(text, expected):
+    assert json_utils.fenced_block(text) == expected
+
+
+def test_fenced_block_raises_index_error_without_block():
+    with pytest.raises(IndexError):
+        json_utils.fenced_block("Invalid JSON response")
@@ -0,0 +1,68 @@
+import sys
+import types
+
+import pytest
+from agent.function_nodes.multi_source_information_gatherer import MultiSourceInformationGathererNode
+from agent.utils.node_cache import NodeResultCache
+from agent.utils.stream_llm import call_llm, set_llm_cache
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Install a stand-in openai module that counts completion requests"""
+    calls = []
+
+    class FakeOpenAI:
+        def __init__(self, api_key=None):
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+        def create(self, model, messages, temperature):
+            calls.append(messages[0]["content"])
+            message = types.SimpleNamespace(content=f"reply to {messages[0]['content']}")
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    module = types.ModuleType("openai")
+    module.OpenAI = FakeOpenAI
+    module.AsyncOpenAI = FakeOpenAI
+    monkeypatch.setitem(sys.modules, "openai", module)
+    return calls
+
+
+def test_call_llm_does_not_cache_by_default(fake_openai):
+    """Sampled replies are not replayed unless the call site asks for it"""
+    call_llm("design a workflow")
+    call_llm("design a workflow")
+    assert fake_openai == ["design a workflow", "design a workflow"]
+
+
+def test_call_llm_reuses_cached_response(fake_openai):
+    assert call_llm("extract findings", use_cache=True) == "reply to extract findings"
+    assert call_llm("extract findings", use_cache=True) == "reply to extract findings"
+    assert call_llm("summarize", use_cache=True) == "reply to summarize"
+    assert fake_openai == ["extract findings", "summarize"]
+
+
+def test_set_llm_cache_none_disables_caching(fake_openai):
+    set_llm_cache(None)
+    call_llm("extract findings", use_cache=True)
+    call_llm("extract findings", use_cache=True)
+    assert fake_openai == ["extract findings", "extract findings"]
+
+
+def test_repeated_research_prompt_hits_cache(fake_openai):
+    """Research prompts carry no per-call timestamp, so re-running a node reuses the reply"""
+    cache = NodeResultCache()
+    set_llm_cache(cache)
+    node = MultiSourceInformationGathererNode()
+    inputs = (
+        {"id": "q1", "question": "How is AI used in medical diagnosis?"},
+        ["web"],
+        [{"title": "AI in medical diagnosis", "snippet": "AI helps diagnosis", "url": "https://example.com"}],
+        {},
+    )
+
+    node.exec(inputs)
+    node.exec(inputs)
+
+    assert len(fake_openai) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -1,7 +1,7 @@
 import pytest
-import asyncio
 import json
-from unittest.mock import AsyncMock, MagicMock, patch
+import re
+from unittest.mock import patch
 from agent.flow import create_general_agent_flow
 from agent.utils.node_registry import node_registry
 from agent.utils.workflow_store import workflow_store
@@ -9,6 +9,94 @@ from agent.function_nodes.user_query import UserQueryNode
 from agent.nodes import WorkflowExecutorNode
 
 
+# Prompt routing for the mocked call_llm, compiled once for every call
+_is_design_prompt = re.compile(r"workflow design", re.IGNORECASE).search
+_is_summary_prompt = re.compile(r"summary", re.IGNORECASE).search
+
+# Canned workflow design responses returned by the mocked designer LLM
+FLIGHT_BOOKING_DESIGN_YAML = """
+```yaml
+thinking: |
+    The user wants to book a flight from LAX to PVG with cost performance focus.
+    We need to search flights, analyze costs, and get user preferences.
+
+workflow:
+  name: Flight Booking Workflow for LAX to PVG
+  description: Book a flight from Los Angeles to Shanghai with cost analysis
+  nodes:
+    - name: flight_search
+      description: Search for flight options and prices from Los Angeles to Shanghai.
+      inputs: ["from", "to", "date"]
+      outputs: ["flight_search_results"]
+      requires_permission: false
+    - name: user_query
+      description: Ask the user for their preferred travel date.
+      inputs: ["user_preferences"]
+      outputs: ["user_response"]
+      requires_permission: false
+    - name: flight_booking
+      description: Book the selected flight ticket based on user confirmation.
+      inputs: ["selected_flight", "user_response"]
+      outputs: ["booking_confirmation"]
+      requires_permission: true
+  
+  connections:
+    - from: flight_search
+      to: cost_analysis
+      action: default
+    - from: cost_analysis
+      to: user_query
+      action: default
+    - from: user_query
+      to: flight_booking
+      action: default
+  
+  shared_store_schema:
+    flight_search_results: "Available flight options"
+    cost_analysis: "Cost analysis results"
+    user_response: "User's travel preferences"
+    booking_confirmation: "Flight booking confirmation"
+
+estimated_steps: 4
+requires_user_input: true
+requires_permission: true
+```
+"""
+
+DESCRIBED_QUERY_DESIGN_YAML = """
+```yaml
+workflow:
+  name: Test Workflow
+  nodes:
+    - name: user_query
+      description: Ask the user for additional information such as preferred date and passenger details.
+      inputs: ["preferred_date", "passenger_details"]
+      outputs: ["user_response"]
+```
+"""
+
+INPUTS_ONLY_QUERY_DESIGN_YAML = """
+```yaml
+workflow:
+  name: Test Workflow
+  nodes:
+    - name: user_query
+      inputs: ["preferred_date", "passenger_details"]
+      outputs: ["user_response"]
+```
+"""
+
+BARE_QUERY_DESIGN_YAML = """
+```yaml
+workflow:
+  name: Test Workflow
+  nodes:
+    - name: user_query
+      outputs: ["user_response"]
+```
+"""
+
+
 class MockWebSocket:
     """Mock WebSocket for testing user interaction flow"""
     
@@ -133,68 +221,22 @@ def mock_shared_store(mock_websocket):
     )
 
 
-@pytest.mark.asyncio
+@pytest.mark.integration
+@pytest.mark.asyncio(loop_scope="session")
 async def test_user_query_flow_with_auto_response(mock_websocket, mock_shared_store, monkeypatch):
     """Test the complete user query flow with auto-response mechanism"""
     
     # Mock the LLM calls to avoid API dependencies
     def mock_call_llm(prompt):
-        if "workflow design" in prompt.lower():
-            return """
-```yaml
-thinking: |
-    The user wants to book a flight from LAX to PVG with cost performance focus.
-    We need to search flights, analyze costs, and get user preferences.
-
-workflow:
-  name: Flight Booking Workflow for LAX to PVG
-  description: Book a flight from Los Angeles to Shanghai with cost analysis
-  nodes:
-    - name: flight_search
-      description: Search for flight options and prices from Los Angeles to Shanghai.
-      inputs: ["from", "to", "date"]
-      outputs: ["flight_search_results"]
-      requires_permission: false
-    - name: user_query
-      description: Ask the user for their preferred travel date.
-      inputs: ["user_preferences"]
-      outputs: ["user_response"]
-      requires_permission: false
-    - name: flight_booking
-      description: Book the selected flight ticket based on user confirmation.
-      inputs: ["selected_flight", "user_response"]
-      outputs: ["booking_confirmation"]
-      requires_permission: true
-  
-  connections:
-    - from: flight_search
-      to: cost_analysis
-      action: default
-    - from: cost_analysis
-      to: user_query
-      action: default
-    - from: user_query
-      to: flight_booking
-      action: default
-  
-  shared_store_schema:
-    flight_search_results: "Available flight options"
-    cost_analysis: "Cost analysis results"
-    user_response: "User's travel preferences"
-    booking_confirmation: "Flight booking confirmation"
-
-estimated_steps: 4
-requires_user_input: true
-requires_permission: true
-```
-"""
-        elif "summary" in prompt.lower():
+        if _is_design_prompt(prompt):
+            return FLIGHT_BOOKING_DESIGN_YAML
+        elif _is_summary_prompt(prompt):
             return "Based on the analysis, here are the best flight options for your trip."
         else:
             return "Mock response"
     
     # Patch the call_llm function
-    with patch('agent.nodes.call_llm', side_effect=mock_call_llm):
+    with patch('agent.nodes.call_llm', new=mock_call_llm):
         # Create and run the flow
         flow = create_general_agent_flow()
         
@@ -233,27 +275,18 @@ requires_permission: true
             pytest.fail(f"User query flow test failed: {e}")
 
 
-@pytest.mark.asyncio
+@pytest.mark.integration
+@pytest.mark.asyncio(loop_scope="session")
 async def test_user_query_node_question_extraction(mock_websocket, mock_shared_store, monkeypatch):
     """Test that user_query node extracts meaningful questions from node config"""
     
     # Mock the LLM calls
     def mock_call_llm(prompt):
-        if "workflow design" in prompt.lower():
-            return """
-```yaml
-workflow:
-  name: Test Workflow
-  nodes:
-    - name: user_query
-      description: Ask the user for additional information such as preferred date and passenger details.
-      inputs: ["preferred_date", "passenger_details"]
-      outputs: ["user_response"]
-```
-"""
+        if _is_design_prompt(prompt):
+            return DESCRIBED_QUERY_DESIGN_YAML
         return "Mock response"
     
-    with patch('agent.nodes.call_llm', side_effect=mock_call_llm):
+    with patch('agent.nodes.call_llm', new=mock_call_llm):
         # Create and run the flow
         flow = create_general_agent_flow()
         
@@ -278,26 +311,18 @@ workflow:
             pytest.fail(f"Question extraction test failed: {e}")
 
 
-@pytest.mark.asyncio
+@pytest.mark.integration
+@pytest.mark.asyncio(loop_scope="session")
 async def test_user_query_node_fallback_question(mock_websocket, mock_shared_store, monkeypatch):
     """Test that user_query node uses inputs to generate question when description is not available"""
     
     # Mock the LLM calls
     def mock_call_llm(prompt):
-        if "workflow design" in prompt.lower():
-            return """
-```yaml
-workflow:
-  name: Test Workflow
-  nodes:
-    - name: user_query
-      inputs: ["preferred_date", "passenger_details"]
-      outputs: ["user_response"]
-```
-"""
+        if _is_design_prompt(prompt):
+            return INPUTS_ONLY_QUERY_DESIGN_YAML
         return "Mock response"
     
-    with patch('agent.nodes.call_llm', side_effect=mock_call_llm):
+    with patch('agent.nodes.call_llm', new=mock_call_llm):
         # Create and run the flow
         flow = create_general_agent_flow()
         
@@ -322,25 +347,18 @@ workflow:
             pytest.fail(f"Fallback question test failed: {e}")
 
 
-@pytest.mark.asyncio
+@pytest.mark.integration
+@pytest.mark.asyncio(loop_scope="session")
 async def test_user_query_node_error_on_no_question(mock_websocket, mock_shared_store, monkeypatch):
     """Test that user_query node raises error when no meaningful question can be generated"""
     
     # Mock the LLM calls
     def mock_call_llm(prompt):
-        if "workflow design" in prompt.lower():
-            return """
-```yaml
-workflow:
-  name: Test Workflow
-  nodes:
-    - name: user_query
-      outputs: ["user_response"]
-```
-"""
+        if _is_design_prompt(prompt):
+            return BARE_QUERY_DESIGN_YAML
         return "Mock response"
     
-    with patch('agent.nodes.call_llm', side_effect=mock_call_llm):
+    with patch('agent.nodes.call_llm', new=mock_call_llm):
         # Create and run the flow
         flow = create_general_agent_flow()
         
@@ -0,0 +1,157 @@
+import asyncio
+import enum
+import json
+from agent.utils import websocket_utils
+from agent.nodes import WorkflowEndNode
+from agent.utils.websocket_utils import safe_send, send_json, broadcast, is_disconnected, WebSocketBatcher
+
+
+class SlowWebSocket:
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.sent = []
+
+    async def send_text(self, data):
+        await asyncio.sleep(self.delays.pop(0))
+        self.sent.append(json.loads(data)["type"])
+
+
+class BrokenWebSocket:
+    async def send_text(self, data):
+        raise RuntimeError("connection closed")
+
+
+def test_safe_send_returns_true_when_delivered():
+    ws = SlowWebSocket([0])
+    assert asyncio.run(safe_send(ws, {"type": "start"})) is True
+    assert ws.sent == ["start"]
+
+
+def test_safe_send_times_out_but_keeps_order():
+    """A slow send continues in the background and later sends queue behind it"""
+    ws = SlowWebSocket([0.05, 0])
+
+    async def run():
+        first = await safe_send(ws, {"type": "first"}, timeout=0.01)
+        second = safe_send(ws, {"type": "second"}, timeout=1)
+        return first, await second
+
+    assert asyncio.run(run()) == (False, True)
+    assert ws.sent == ["first", "second"]
+
+
+def test_send_json_queues_behind_a_background_send():
+    """A direct send never overtakes a timed-out send that is still in flight"""
+    ws = SlowWebSocket([0.05, 0])
+
+    async def run():
+        assert await safe_send(ws, {"type": "workflow_progress"}, timeout=0.01) is False
+        await send_json(ws, {"type": "error"})
+
+    asyncio.run(run())
+    assert ws.sent == ["workflow_progress", "error"]
+    assert ws not in websocket_utils._pending_sends
+
+
+def test_safe_send_swallows_errors():
+    assert asyncio.run(safe_send(BrokenWebSocket(), {"type": "end"})) is False
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, data):
+        self.frames.append(json.loads(data))
+
+
+def test_batcher_coalesces_ready_messages_into_one_frame():
+    ws = RecordingWebSocket()
+
+    async def run():
+        batcher = WebSocketBatcher(ws)
+        for i in range(3):
+            await batcher.enqueue({"type": "node_complete", "content": i})
+        await batcher.flush()
+        await batcher.enqueue({"type": "workflow_complete", "content": {}})
+        await batcher.flush()
+        await batcher.close()
+
+    asyncio.run(run())
+    assert ws.frames == [
+        [{"type": "node_complete", "content": i} for i in range(3)],
+        {"type": "workflow_complete", "content": {}},
+    ]
+
+
+def test_batcher_close_sends_queued_messages():
+    """A message queued right before the connection loop ends is still delivered"""
+    ws = RecordingWebSocket()
+
+    async def run():
+        batcher = WebSocketBatcher(ws)
+        await batcher.enqueue({"type": "workflow_complete", "content": {}})
+        await batcher.close()
+
+    asyncio.run(run())
+    assert ws.frames == [{"type": "workflow_complete", "content": {}}]
+
+
+def test_batcher_close_gives_up_on_a_stuck_socket():
+    ws = SlowWebSocket([1])
+
+    async def run():
+        batcher = WebSocketBatcher(ws)
+        await batcher.enqueue({"type": "workflow_complete", "content": {}})
+        await batcher.close(timeout=0.01)
+
+    asyncio.run(run())
+    assert ws.sent == []
+
+
+def test_batcher_respects_batch_limits():
+    ws = RecordingWebSocket()
+
+    async def run():
+        batcher = WebSocketBatcher(ws, max_batch=2)
+        for i in range(5):
+            await batcher.enqueue({"type": "chunk", "content": i})
+        await batcher.flush()
+        await batcher.close()
+
+    asyncio.run(run())
+    assert [len(frame) if isinstance(frame, list) else 1 for frame in ws.frames] == [2, 2, 1]
+
+
+def test_safe_send_accepts_pre_serialized_messages():
+    ws = RecordingWebSocket()
+    assert asyncio.run(safe_send(ws, '{"type":"end","content":""}')) is True
+    assert ws.frames == [{"type": "end", "content": ""}]
+
+
+def test_broadcast_sends_to_every_client_in_chunks(monkeypatch):
+    monkeypatch.setattr(websocket_utils, "BROADCAST_BATCH_SIZE", 2)
+    clients = [RecordingWebSocket() for _ in range(5)] + [BrokenWebSocket()]
+
+    delivered = asyncio.run(broadcast(clients, {"type": "workflow_complete", "content": {}}))
+
+    assert delivered == 5
+    assert all(ws.frames == [{"type": "workflow_complete", "content": {}}] for ws in clients[:5])
+
+
+class ClosedWebSocket(RecordingWebSocket):
+    client_state = enum.Enum("WebSocketState", "CONNECTING CONNECTED DISCONNECTED").DISCONNECTED
+
+
+def test_workflow_end_node_skips_serialization_for_closed_sockets(monkeypatch):
+    def fail(workflow_results):
+        raise AssertionError("results serialized for a closed socket")
+
+    monkeypatch.setattr(WorkflowEndNode, "_completion_message", staticmethod(fail))
+    ws = ClosedWebSocket()
+    shared = {"websocket": ws, "workflow_results": {"web_search": "done"}}
+    asyncio.run(WorkflowEndNode().run_async(shared))
+
+    assert is_disconnected(ws) and not is_disconnected(RecordingWebSocket())
+    assert ws.frames == []
+    assert shared["workflow_complete"] is True
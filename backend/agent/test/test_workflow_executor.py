@@ -0,0 +1,204 @@
+import asyncio
+import pytest
+from pocketflow import Node
+from agent.nodes import WorkflowExecutorNode
+from agent.utils.node_cache import NodeResultCache
+
+
+PARALLEL_WORKFLOW = {
+    "nodes": [
+        {"name": "web_search", "inputs": ["query"], "outputs": ["search_results"]},
+        {"name": "data_formatter", "inputs": ["workflow_results"], "outputs": ["formatted_data"]},
+        {"name": "result_summarizer", "inputs": ["search_results", "formatted_data"], "outputs": ["result_summary"]},
+        {"name": "user_query"},
+        {"name": "firecrawl_scrape"},
+    ],
+    "connections": [
+        {"from": "web_search", "to": "result_summarizer", "action": "default"},
+        {"from": "data_formatter", "to": "result_summarizer", "action": "default"},
+    ],
+}
+
+
+def test_plan_execution_stages_groups_independent_nodes():
+    """Independent branches share a stage; interactive nodes always run alone"""
+    stages = WorkflowExecutorNode()._plan_execution_stages(PARALLEL_WORKFLOW)
+    assert stages == [[0, 1], [2], [3], [4]]
+
+
+def test_plan_execution_stages_sequential_without_connections():
+    """Without connections the node list order is kept as a strict sequence"""
+    workflow = {"nodes": PARALLEL_WORKFLOW["nodes"], "connections": []}
+    stages = WorkflowExecutorNode()._plan_execution_stages(workflow)
+    assert stages == [[0], [1], [2], [3], [4]]
+
+
+def test_plan_execution_stages_resume_skips_completed_nodes():
+    """Resuming from an index only plans the remaining nodes"""
+    stages = WorkflowExecutorNode()._plan_execution_stages(PARALLEL_WORKFLOW, start_index=4)
+    assert stages == [[4]]
+
+
+def _two_branch_workflow(first, second):
+    """Two nodes that only feed a summarizer, so key conflicts are the only link between them"""
+    return {
+        "nodes": [first, second, {"name": "result_summarizer", "inputs": [], "outputs": ["result_summary"]}],
+        "connections": [
+            {"from": first["name"], "to": "result_summarizer", "action": "default"},
+            {"from": second["name"], "to": "result_summarizer", "action": "default"},
+        ],
+    }
+
+
+def test_plan_execution_stages_orders_conflicting_writes():
+    """Nodes writing the same key, or overwriting a key read earlier, never share a stage"""
+    same_output = _two_branch_workflow(
+        {"name": "web_search", "inputs": ["query"], "outputs": ["search_results"]},
+        {"name": "firecrawl_scrape", "inputs": ["url"], "outputs": ["search_results"]},
+    )
+    assert WorkflowExecutorNode()._plan_execution_stages(same_output) == [[0], [1], [2]]
+
+    overwrites_input = _two_branch_workflow(
+        {"name": "web_search", "inputs": ["query"], "outputs": ["search_results"]},
+        {"name": "data_formatter", "inputs": [], "outputs": ["query"]},
+    )
+    assert WorkflowExecutorNode()._plan_execution_stages(overwrites_input) == [[0], [1], [2]]
+
+
+def test_plan_execution_stages_counts_keys_the_executor_fills_in():
+    """web_search's query auto-fill conflicts with a node that declares query, though web_search does not"""
+    reads_query = _two_branch_workflow(
+        {"name": "web_search", "inputs": ["user_message"], "outputs": ["search_results"]},
+        {"name": "data_formatter", "inputs": ["query"], "outputs": ["formatted_data"]},
+    )
+    assert WorkflowExecutorNode()._plan_execution_stages(reads_query) == [[0], [1], [2]]
+
+
+def test_plan_execution_stages_sequential_without_declared_keys_or_connections():
+    """Nodes without both key lists, or missing from the connections, keep list order"""
+    undeclared = _two_branch_workflow(
+        {"name": "web_search", "outputs": ["search_results"]},
+        {"name": "data_formatter", "inputs": [], "outputs": ["formatted_data"]},
+    )
+    assert WorkflowExecutorNode()._plan_execution_stages(undeclared) == [[0], [1], [2]]
+
+    unlisted = {
+        "nodes": PARALLEL_WORKFLOW["nodes"][:3] + [{"name": "firecrawl_scrape", "inputs": ["url"], "outputs": ["scraped"]}],
+        "connections": PARALLEL_WORKFLOW["connections"],
+    }
+    assert WorkflowExecutorNode()._plan_execution_stages(unlisted) == [[0], [1], [2], [3]]
+
+
+def test_exec_async_stage_failure_waits_for_siblings_and_logs_all(monkeypatch, caplog):
+    """Every failure in a concurrent stage is logged and siblings finish before the first is raised"""
+    node = WorkflowExecutorNode()
+    finished = []
+
+    async def fake_execute(i, nodes, nodes_by_name, workflow_design, websocket, shared, results):
+        await asyncio.sleep(0.01 * i)
+        finished.append(i)
+        raise RuntimeError(f"boom {i}")
+
+    monkeypatch.setattr(node, "_execute_workflow_node", fake_execute)
+    workflow = {"nodes": PARALLEL_WORKFLOW["nodes"][:3], "connections": PARALLEL_WORKFLOW["connections"]}
+    prep_res = {"workflow_design": {"workflow": workflow}, "websocket": None, "shared": {}}
+    with caplog.at_level("ERROR", logger="agent.nodes"):
+        with pytest.raises(RuntimeError, match="boom 0"):
+            asyncio.run(node.exec_async(prep_res))
+
+    assert finished == [0, 1]
+    assert "boom 0" in caplog.text and "boom 1" in caplog.text
+
+
+def test_exec_async_runs_stage_concurrently(monkeypatch):
+    """Nodes in the same stage overlap instead of running back to back"""
+    node = WorkflowExecutorNode()
+    running = []
+    overlap = []
+
+    async def fake_execute(i, nodes, nodes_by_name, workflow_design, websocket, shared, results):
+        running.append(i)
+        overlap.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(i)
+        results[nodes[i]["name"]] = f"done {i}"
+
+    monkeypatch.setattr(node, "_execute_workflow_node", fake_execute)
+    workflow = {"nodes": PARALLEL_WORKFLOW["nodes"][:3], "connections": PARALLEL_WORKFLOW["connections"]}
+    prep_res = {"workflow_design": {"workflow": workflow}, "websocket": None, "shared": {}}
+    results = asyncio.run(node.exec_async(prep_res))
+
+    assert max(overlap) == 2
+    assert set(results) == {"web_search", "data_formatter", "result_summarizer"}
+
+
+class CountingNode(Node):
+    calls = 0
+
+    def prep(self, shared):
+        return shared["query"]
+
+    def exec(self, query):
+        CountingNode.calls += 1
+        return f"answer for {query}"
+
+    def post(self, shared, prep_res, exec_res):
+        shared["answer"] = exec_res
+        return "default"
+
+
+def test_run_function_node_memoizes_identical_inputs():
+    """A cacheable node only executes once for bit-identical prep inputs"""
+    CountingNode.calls = 0
+    executor = WorkflowExecutorNode()
+
+    async def run(query):
+        shared = {"query": query}
+        await executor._run_function_node(CountingNode(), shared, cache_name="counting")
+        return shared["answer"]
+
+    assert asyncio.run(run("flights")) == "answer for flights"
+    assert asyncio.run(run("flights")) == "answer for flights"
+    assert CountingNode.calls == 1
+    assert asyncio.run(run("hotels")) == "answer for hotels"
+    assert CountingNode.calls == 2
+
+
+class ListNode(Node):
+    def prep(self, shared):
+        return shared["query"]
+
+    def exec(self, query):
+        return {"query": query, "items": ["first"]}
+
+    def post(self, shared, prep_res, exec_res):
+        shared["result"] = exec_res
+        return "default"
+
+
+def test_run_function_node_cache_hits_are_isolated_from_shared():
+    """Changing a result in shared never leaks into the cached copy or other runs"""
+    executor = WorkflowExecutorNode()
+
+    async def run():
+        shared = {"query": "flights"}
+        await executor._run_function_node(ListNode(), shared, cache_name="list")
+        return shared
+
+    first = asyncio.run(run())
+    first["result"]["items"].append("changed by a later node")
+    second = asyncio.run(run())
+    assert second["result"] == {"query": "flights", "items": ["first"]}
+    second["result"]["query"] = "changed again"
+    assert asyncio.run(run())["result"]["query"] == "flights"
+
+
+def test_node_result_cache_evicts_least_recently_used():
+    cache = NodeResultCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
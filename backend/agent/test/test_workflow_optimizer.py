@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+import agent.nodes
+from agent.nodes import WorkflowDesignerNode, WorkflowOptimizerNode
+
+
+WORKFLOW = {"workflow": {"name": "Search", "nodes": [{"name": "web_search"}, {"name": "result_summarizer"}]}}
+
+
+def _prep_res(results, retry_attempt=0, feedback=""):
+    return {
+        "workflow_results": results,
+        "user_feedback": feedback,
+        "original_workflow": WORKFLOW,
+        "retry_attempt": retry_attempt,
+    }
+
+
+def test_retryable_error_skips_llm(monkeypatch):
+    """A single transient failure is retried without an LLM round-trip"""
+    def fail_llm(prompt):
+        raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(agent.nodes, "call_llm", fail_llm)
+    results = {"web_search": "ok", "result_summarizer": "Error generating summary: Rate limit exceeded"}
+    plan = asyncio.run(WorkflowOptimizerNode().exec_async(_prep_res(results)))
+
+    assert plan["strategy"] == "retry_with_backoff"
+    assert plan["retry_nodes"] == ["result_summarizer"]
+    assert plan["revised_workflow"] is WORKFLOW
+
+
+@pytest.mark.parametrize("results, retry_attempt, feedback", [
+    ({"result_summarizer": "Error generating summary: invalid API key"}, 0, ""),
+    ({"result_summarizer": "Error generating summary: Request timed out"}, WorkflowOptimizerNode.MAX_RETRY_ATTEMPTS, ""),
+    ({"result_summarizer": "Error generating summary: 503 Service Unavailable"}, 0, "this is wrong"),
+    ({"result_summarizer": "Error: processed 512 items before the input was rejected"}, 0, ""),
+])
+def test_non_retryable_cases_ask_llm(monkeypatch, results, retry_attempt, feedback):
+    """Permanent errors, exhausted retries and unhappy users still go to the LLM"""
+    calls = []
+
+    def fake_llm(prompt):
+        calls.append(prompt)
+        return "```yaml\noptimization_needed: true\nissues: []\n```"
+
+    monkeypatch.setattr(agent.nodes, "call_llm", fake_llm)
+    plan = asyncio.run(WorkflowOptimizerNode().exec_async(_prep_res(results, retry_attempt, feedback)))
+
+    assert len(calls) == 1
+    assert "strategy" not in plan
+
+
+@pytest.mark.parametrize("error", [
+    "Error code: 503 - upstream overloaded",
+    "HTTP 502 from search backend",
+    "Server returned status=500",
+    "504 Gateway Timeout",
+])
+def test_server_errors_are_retryable(error):
+    assert agent.nodes._RETRYABLE_ERROR_RE.search(error)
+
+
+def test_retry_post_schedules_exponential_backoff():
+    node = WorkflowOptimizerNode()
+    shared = {"retry_attempt": 2, "current_node_index": 1}
+    plan = {"optimization_needed": True, "strategy": "retry_with_backoff"}
+    action = asyncio.run(node.post_async(shared, {}, plan))
+
+    assert action == "retry_workflow"
+    assert shared["retry_attempt"] == 3
+    assert shared["retry_delay"] == node.RETRY_BASE_DELAY * 4
+    assert "current_node_index" not in shared
+
+
+def test_prompt_summary_drops_result_payloads():
+    design = {
+        "thinking": "long reasoning",
+        "workflow": {
+            "name": "Search",
+            "nodes": [{"name": "web_search", "description": "Search", "inputs": ["query"], "outputs": ["search_results"]}],
+            "connections": [],
+            "shared_store_schema": {"query": "Search query"},
+        },
+    }
+    results = {"web_search": [{"title": "t", "body": "b" * 1000}], "result_summarizer": "Error: bad input"}
+    workflow_summary, results_summary = WorkflowOptimizerNode._summarize_for_prompt(design, results, ["result_summarizer"])
+
+    assert workflow_summary == {
+        "name": "Search",
+        "nodes": [{"name": "web_search", "description": "Search"}],
+        "connections": [],
+    }
+    assert results_summary == {"web_search": "completed", "result_summarizer": "Error: bad input"}
+
+
+DESIGN_REPLY = "```yaml\nworkflow:\n  name: Search\n  nodes:\n    - name: web_search\n  connections: []\n```"
+
+
+def _design(shared):
+    async def run():
+        node = WorkflowDesignerNode()
+        prep_res = await node.prep_async(shared)
+        await node.post_async(shared, prep_res, await node.exec_async(prep_res))
+    asyncio.run(run())
+
+
+def test_optimization_plan_only_revises_its_own_question(monkeypatch):
+    """After a re-design, the next question on the same connection gets a plain design prompt"""
+    prompts = []
+
+    def fake_llm(prompt):
+        prompts.append(prompt)
+        return DESIGN_REPLY
+
+    monkeypatch.setattr(agent.nodes, "call_llm", fake_llm)
+    shared = {"user_message": "Find cheap flights to Tokyo", "conversation_history": []}
+    _design(shared)
+    plan = {"optimization_needed": True, "issues": ["too few results"]}
+    assert asyncio.run(WorkflowOptimizerNode().post_async(shared, {}, plan)) == "optimize_workflow"
+    _design(shared)
+
+    shared["user_message"] = "Summarize today's AI news"
+    _design(shared)
+
+    assert "did not satisfy the user" in prompts[1]
+    assert "did not satisfy the user" not in prompts[2]
+    assert "optimization_plan" not in shared
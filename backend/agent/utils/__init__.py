@@ -1,5 +1,5 @@
 # Utils package for FastAPI WebSocket Chat Interface 
-from .stream_llm import stream_llm, call_llm
+from .stream_llm import stream_llm, call_llm, set_llm_cache
 from .node_registry import NodeRegistry
 from .workflow_store import WorkflowStore
 from .permission_manager import PermissionManager
@@ -7,6 +7,7 @@ from .permission_manager import PermissionManager
 __all__ = [
     'stream_llm',
     'call_llm', 
+    'set_llm_cache',
     'NodeRegistry',
     'WorkflowStore',
     'PermissionManager'
@@ -0,0 +1,76 @@
+"""
+Workflow Design Cache
+
+This module remembers workflow designs produced by the LLM so that a repeated
+user question can reuse the previous design instead of paying for another
+design call. A design is only reused for the same question (compared after
+lowercasing and collapsing whitespace) asked in the same context - the
+available nodes and the conversation so far - because designs carry
+question-specific node parameters and text.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class DesignCache:
+    """Exact-question cache of workflow designs"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        """Lowercase a question and collapse its whitespace"""
+        return " ".join(question.lower().split())
+
+    @classmethod
+    def make_key(cls, question: str, context: Any = None) -> Optional[str]:
+        """Hash a normalized question and its design context; None for an empty question"""
+        normalized = cls.normalize(question)
+        if not normalized:
+            return None
+        payload = json.dumps([normalized, context], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def lookup(self, question: str, context: Any = None) -> Optional[Dict[str, Any]]:
+        """Return a copy of the design cached for this question and context"""
+        key = self.make_key(question, context)
+        design = self._entries.get(key) if key else None
+        if design is None:
+            return None
+        self._entries.move_to_end(key)
+        logger.info("♻️ DesignCache: Reusing cached design")
+        return copy.deepcopy(design)
+
+    def store(self, question: str, design: Dict[str, Any], context: Any = None):
+        """Remember a design for a question, dropping the least recently used entry when full"""
+        key = self.make_key(question, context)
+        if not key:
+            return
+        self._entries[key] = copy.deepcopy(design)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, question: str, context: Any = None):
+        """Forget the design cached for this question, e.g. after it failed"""
+        key = self.make_key(question, context)
+        if key:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every cached design"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Global design cache instance
+design_cache = DesignCache()
@@ -0,0 +1,59 @@
+"""
+JSON helpers
+
+Thin wrappers that use orjson when it is installed and fall back to the
+standard library otherwise. dumps() always returns str so the result can be
+sent as a WebSocket text frame (the frontend parses text frames as JSON).
+Both backends accept datetimes, UUIDs and dataclasses, which orjson encodes
+natively and the stdlib path handles through _default(). fenced_block()
+pulls the JSON body out of a fenced LLM reply.
+"""
+
+import dataclasses
+import datetime
+import json
+import uuid
+from typing import Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _default(obj: Any) -> Any:
+    """Encode the types orjson supports natively for the stdlib fallback"""
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj: Any) -> str:
+    """Serialize obj to a compact JSON string"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+def fenced_block(text: str, lang: str = "json") -> str:
+    """
+    Return the stripped body of the first ```lang fenced block in text.
+
+    An unterminated block runs to the end of text. Raises IndexError when
+    there is no such block, like the split()[1] idiom it replaces.
+    """
+    marker = "```" + lang
+    start = text.find(marker)
+    if start == -1:
+        raise IndexError(f"no ```{lang} block in text")
+    start += len(marker)
+    end = text.find("```", start)
+    return (text[start:] if end == -1 else text[start:end]).strip()
+
+def loads(data: Any) -> Any:
+    """Parse JSON from str or bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,73 @@
+"""
+Node Result Cache
+
+This module memoizes function node executions. A node's exec() result is
+keyed by a content hash of the node name and the exact inputs its prep()
+produced, so re-running a workflow over bit-identical inputs can skip the
+expensive exec step (web searches, LLM calls) and replay the stored result.
+Results are deep-copied on the way in and out, because post() hands them to
+the shared store where later nodes change them in place.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class NodeResultCache:
+    """In-memory LRU cache of function node exec() results"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(node_name: str, inputs: Any) -> Optional[str]:
+        """Hash a node name and its prep() result; None if inputs are not hashable as JSON"""
+        try:
+            payload = json.dumps([node_name, inputs], sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, copy of the result) for a key, evicting it if it has expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        stored_at, result = entry
+        if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, copy.deepcopy(result)
+
+    def set(self, key: str, result: Any):
+        """Store a copy of a result, dropping the least recently used entry when full"""
+        self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached result"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Global node result cache instance
+node_result_cache = NodeResultCache()
@@ -17,6 +17,7 @@ class NodeLoader:
     
     def __init__(self):
         self._node_cache: Dict[str, Type[Node]] = {}
+        self._instance_cache: Dict[str, Node] = {}
     
     def load_node_class(self, module_path: str, class_name: str) -> Optional[Type[Node]]:
         """
@@ -98,6 +99,28 @@ class NodeLoader:
             logger.error(f"❌ NodeLoader: Failed to create node instance for {node_metadata.get('name', 'unknown')}: {e}")
             return None
     
+    def get_node_instance(self, node_metadata: Dict[str, Any]) -> Optional[Node]:
+        """
+        Get a shared node instance, creating it on first use.
+        
+        Function nodes keep no per-call state, so one instance per class can
+        serve every workflow and keep whatever its __init__ set up (clients,
+        sessions, loaded models) warm across runs.
+        
+        Args:
+            node_metadata: Node metadata dictionary containing module_path and class_name
+            
+        Returns:
+            Node instance if successfully created, None otherwise
+        """
+        cache_key = f"{node_metadata.get('module_path')}.{node_metadata.get('class_name')}"
+        node_instance = self._instance_cache.get(cache_key)
+        if node_instance is None:
+            node_instance = self.create_node_instance(node_metadata)
+            if node_instance is not None:
+                self._instance_cache[cache_key] = node_instance
+        return node_instance
+    
     def get_available_nodes(self) -> Dict[str, Type[Node]]:
         """Get all cached node classes"""
         return self._node_cache.copy()
@@ -105,6 +128,7 @@ class NodeLoader:
     def clear_cache(self):
         """Clear the node cache"""
         self._node_cache.clear()
+        self._instance_cache.clear()
         logger.info("🧹 NodeLoader: Cleared node cache")
 
 # Global node loader instance
@@ -47,12 +47,14 @@ class NodeMetadata:
     estimated_time: Optional[int] = None  # in seconds
     module_path: Optional[str] = None
     class_name: Optional[str] = None
+    cacheable: bool = False  # exec() result may be reused for identical inputs
 
 class NodeRegistry:
     """Registry of available nodes for workflow design"""
     
     def __init__(self, config_path: Optional[str] = None):
         self.nodes: Dict[str, NodeMetadata] = {}
+        self._dict_cache: Optional[Dict[str, Any]] = None
         self.config_path = config_path or self._get_default_config_path()
         self._load_nodes_from_config()
     
@@ -100,7 +102,8 @@ class NodeRegistry:
                         estimated_cost=node_data.get("estimated_cost"),
                         estimated_time=node_data.get("estimated_time"),
                         module_path=node_data.get("module_path"),
-                        class_name=node_data.get("class_name")
+                        class_name=node_data.get("class_name"),
+                        cacheable=node_data.get("cacheable", False)
                     )
                     
                     self.register_node(metadata)
@@ -215,6 +218,7 @@ class NodeRegistry:
     def register_node(self, metadata: NodeMetadata):
         """Register a new node in the registry"""
         self.nodes[metadata.name] = metadata
+        self._dict_cache = None
     
     def get_node(self, name: str) -> Optional[NodeMetadata]:
         """Get a node by name"""
@@ -248,8 +252,13 @@ class NodeRegistry:
         return relevant_nodes
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert registry to dictionary for LLM consumption"""
-        return {
+        """
+        Convert registry to dictionary for LLM consumption.
+        The result is built once and reused until nodes change; treat it as read-only.
+        """
+        if self._dict_cache is not None:
+            return self._dict_cache
+        self._dict_cache = {
             "nodes": {
                 name: {
                     "name": metadata.name,
@@ -267,11 +276,13 @@ class NodeRegistry:
                 for name, metadata in self.nodes.items()
             }
         }
+        return self._dict_cache
     
     def reload_config(self):
         """Reload the configuration file"""
         logger.info("🔄 NodeRegistry: Reloading configuration")
         self.nodes.clear()
+        self._dict_cache = None
         self._load_nodes_from_config()
 
 # Global registry instance
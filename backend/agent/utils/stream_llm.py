@@ -1,4 +1,20 @@
 import os
+import threading
+from typing import Optional
+
+from .node_cache import NodeResultCache
+
+# Completions for prompts already sent, so a call site that opts in with
+# use_cache=True skips the API round-trip for a repeated identical prompt.
+# Function nodes call call_llm from executor threads, hence the lock.
+_llm_cache: Optional[NodeResultCache] = NodeResultCache(max_entries=256)
+_llm_cache_lock = threading.Lock()
+
+def set_llm_cache(cache: Optional[NodeResultCache]):
+    """Replace the call_llm response cache; pass None to disable caching"""
+    global _llm_cache
+    with _llm_cache_lock:
+        _llm_cache = cache
 
 async def stream_llm(messages):
     client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
@@ -14,7 +30,19 @@ async def stream_llm(messages):
         if chunk.choices[0].delta.content is not None:
             yield chunk.choices[0].delta.content
 
-def call_llm(prompt):  
+def call_llm(prompt, use_cache: bool = False):
+    """
+    Complete a single-message prompt. Replies are sampled, so only call sites
+    that want a repeated prompt to get the same reply pass use_cache=True.
+    """
+    with _llm_cache_lock:
+        cache = _llm_cache if use_cache else None
+        key = cache.make_key("call_llm", prompt) if cache is not None else None
+        if key is not None:
+            hit, content = cache.get(key)
+            if hit:
+                return content
+
     from openai import AsyncOpenAI, OpenAI  
     client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
     response = client.chat.completions.create(
@@ -22,7 +50,12 @@ def call_llm(prompt):
         messages=[{"role": "user", "content": prompt}],
         temperature=0.7
     )
-    return response.choices[0].message.content
+    content = response.choices[0].message.content
+
+    if key is not None and content:
+        with _llm_cache_lock:
+            cache.set(key, content)
+    return content
 
 def call_gemini(prompt: str, model: str = "gemini-2.0-flash-001") -> str:
     from google import genai
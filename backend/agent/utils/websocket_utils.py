@@ -0,0 +1,203 @@
+"""
+WebSocket helpers
+
+Every message pushed to the frontend is a JSON object sent as a text frame.
+send_json() serializes through json_utils (orjson when available) so call
+sites do not each pay for stdlib json.dumps. Every send to a websocket joins
+one per-socket chain, so frames leave in the order they were started even
+when an earlier one is still in flight. safe_send() is the
+fire-and-forget variant used by the agent nodes: a slow or broken client can
+delay a node by at most the send timeout and never fails the workflow.
+WebSocketBatcher coalesces messages queued close together into one frame
+and drains its queue when the connection closes.
+broadcast() fans one message out to many websockets.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+from . import json_utils
+
+logger = logging.getLogger(__name__)
+
+# A message dict, or a JSON string that is already serialized
+Message = Union[Dict[str, Any], str]
+
+# Seconds a node waits for a send before moving on
+SEND_TIMEOUT = 0.5
+
+# Seconds a closing batcher keeps draining its queue before dropping the rest
+CLOSE_TIMEOUT = 2.0
+
+# Clients sent to concurrently before yielding to the event loop
+BROADCAST_BATCH_SIZE = 50
+
+# Last in-flight send per websocket, so sends keep their order; weakly keyed so
+# a closed socket's entry can never be picked up by a later connection
+_pending_sends: "weakref.WeakKeyDictionary[Any, asyncio.Future]" = weakref.WeakKeyDictionary()
+# Sends that outlived their timeout; nobody else will report their failure
+_background_sends: Set[asyncio.Future] = set()
+
+async def send_json(websocket, message: Message):
+    """Serialize a message (unless already a JSON string) and send it as one text frame, after any pending send"""
+    await _schedule_send(websocket, _serialize(message))
+
+def is_disconnected(websocket) -> bool:
+    """True once either side of a Starlette websocket has closed; unknown objects count as connected"""
+    for state in (getattr(websocket, "client_state", None), getattr(websocket, "application_state", None)):
+        if getattr(state, "name", None) == "DISCONNECTED":
+            return True
+    return False
+
+def _serialize(message: Message) -> str:
+    return message if isinstance(message, str) else json_utils.dumps(message)
+
+async def _ordered_send(websocket, data: str, previous):
+    if previous is not None and not previous.done():
+        await asyncio.wait([previous])
+    await websocket.send_text(data)
+
+def _finish_send(websocket, task: asyncio.Future):
+    if _pending_sends.get(websocket) is task:
+        del _pending_sends[websocket]
+    error = None if task.cancelled() else task.exception()
+    if task in _background_sends:
+        _background_sends.discard(task)
+        if error is not None:
+            logger.warning("⚠️ WebSocket: Background send failed: %s", error)
+
+def _schedule_send(websocket, data: str) -> asyncio.Future:
+    """Start a text send that runs after any earlier pending send on the same websocket"""
+    task = asyncio.ensure_future(_ordered_send(websocket, data, _pending_sends.get(websocket)))
+    _pending_sends[websocket] = task
+    task.add_done_callback(lambda t: _finish_send(websocket, t))
+    return task
+
+async def safe_send(websocket, message: Message, timeout: float = SEND_TIMEOUT) -> bool:
+    """
+    Send a message without letting the client stall or break the caller.
+
+    The write is shielded, so when it takes longer than ``timeout`` it keeps
+    going in the background (after any earlier pending send on the same
+    websocket) while the caller continues. Returns True if the message was
+    written within the timeout, False if it is still pending or failed.
+    """
+    message_type = message.get("type") if isinstance(message, dict) else "pre-serialized"
+    try:
+        data = _serialize(message)
+    except (TypeError, ValueError) as e:
+        logger.warning("⚠️ WebSocket: Dropped unserializable '%s' message: %s", message_type, e)
+        return False
+
+    task = _schedule_send(websocket, data)
+    try:
+        await asyncio.wait_for(asyncio.shield(task), timeout)
+        return True
+    except asyncio.TimeoutError:
+        _background_sends.add(task)
+        logger.warning("⚠️ WebSocket: '%s' send still pending after %.1fs, continuing in background", message_type, timeout)
+        return False
+    except Exception as e:
+        logger.warning("⚠️ WebSocket: Failed to send '%s' message: %s", message_type, e)
+        return False
+
+async def broadcast(clients: Iterable[Any], message: Message, timeout: float = SEND_TIMEOUT) -> int:
+    """
+    Send one message to many websockets.
+
+    Clients are sent to in chunks of ``BROADCAST_BATCH_SIZE``. Each chunk runs
+    in a TaskGroup, so cancelling the caller cancels every send in it, and the
+    loop yields between chunks so a large fan-out cannot stall other tasks.
+    The message is serialized once. Returns how many clients got it within
+    the timeout.
+    """
+    clients = list(clients)
+    if not clients:
+        return 0
+    try:
+        data = _serialize(message)
+    except (TypeError, ValueError) as e:
+        logger.warning("⚠️ WebSocket: Dropped unserializable broadcast: %s", e)
+        return 0
+
+    delivered = 0
+    for start in range(0, len(clients), BROADCAST_BATCH_SIZE):
+        if start:
+            await asyncio.sleep(0)
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(safe_send(client, data, timeout))
+                     for client in clients[start:start + BROADCAST_BATCH_SIZE]]
+        delivered += sum(task.result() for task in tasks)
+    return delivered
+
+class WebSocketBatcher:
+    """
+    Per-connection message queue drained by a background writer.
+
+    Messages are serialized on enqueue. The writer takes everything that is
+    ready (up to ``max_batch`` messages or ``max_bytes`` of JSON) and sends it
+    as one text frame: a lone message is sent as-is, several as a JSON array
+    that the frontend unwraps.
+    """
+
+    def __init__(self, websocket, max_batch: int = 128, max_bytes: int = 64 * 1024):
+        self.websocket = websocket
+        self.max_batch = max_batch
+        self.max_bytes = max_bytes
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._writer: Optional[asyncio.Task] = None
+        self._carry: Optional[str] = None
+
+    async def enqueue(self, message: Message):
+        """Queue a message for the next batch, starting the writer on first use"""
+        self._queue.put_nowait(_serialize(message))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._run())
+
+    async def flush(self):
+        """Wait until every queued message has been handed to the websocket"""
+        await self._queue.join()
+
+    async def close(self, timeout: float = CLOSE_TIMEOUT):
+        """Send what is still queued (for up to ``timeout`` seconds), then stop the writer"""
+        if self._writer is not None and not self._writer.done():
+            try:
+                await asyncio.wait_for(self.flush(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ WebSocketBatcher: Dropping %s queued messages on close", self._queue.qsize())
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        self._carry = None
+
+    async def _next_batch(self) -> List[str]:
+        first = self._carry if self._carry is not None else await self._queue.get()
+        self._carry = None
+        batch, size = [first], len(first)
+        while len(batch) < self.max_batch and not self._queue.empty():
+            message = self._queue.get_nowait()
+            size += len(message)
+            if size > self.max_bytes:
+                # Over the size cap: it opens the next batch instead
+                self._carry = message
+                break
+            batch.append(message)
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            data = batch[0] if len(batch) == 1 else "[" + ",".join(batch) + "]"
+            try:
+                await _schedule_send(self.websocket, data)
+            except Exception as e:
+                logger.warning("⚠️ WebSocketBatcher: Dropped batch of %s messages: %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
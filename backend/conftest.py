@@ -2,8 +2,20 @@
 Pytest configuration file for the backend tests.
 """
 
-import sys
-import os
+import pytest
 
-# Add the current directory to Python path so imports work correctly
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) 
\ No newline at end of file
+# The backend directory is put on sys.path once by pytest.ini (pythonpath = .)
+
+
+@pytest.fixture(autouse=True)
+def _clear_agent_caches():
+    """Keep memoized node results, workflow designs and LLM responses from leaking between tests"""
+    from agent.utils.node_cache import NodeResultCache, node_result_cache
+    from agent.utils.design_cache import design_cache
+    from agent.utils.stream_llm import set_llm_cache
+    node_result_cache.clear()
+    design_cache.clear()
+    set_llm_cache(NodeResultCache(max_entries=256))
+    yield
+    node_result_cache.clear()
+    design_cache.clear()
@@ -36,8 +36,9 @@ print("\n🚀 Starting Deep Research Workflow (with real web search, using only
 query_decomposer.run(shared)
 sub_questions = shared.get("sub_questions", [])
 
-# 5. Step 2: For each sub-question, perform web search and gather information
+# 5. Step 2: For each sub-question, perform web search, then gather information for all of them at once
 shared["research_findings"] = {}  # Ensure findings dict exists
+gather_inputs = []
 for subq in sub_questions:
     subq_id = subq.get("id", "unknown")
     subq_text = subq.get("question", "")
@@ -50,8 +51,11 @@ for subq in sub_questions:
     except Exception as e:
         print(f"⚠️  Web search failed for sub-question [{subq_id}]: {e}")
         shared["search_results"] = []  # Set empty results to allow gatherer to proceed
-    # Run information gatherer
-    info_gatherer.run(shared)
+    gather_inputs.append(info_gatherer.prep(shared))
+
+# Run information gatherer: the LLM calls overlap, findings are stored in sub-question order
+for inputs, findings in zip(gather_inputs, info_gatherer.exec_batch(gather_inputs)):
+    info_gatherer.post(shared, inputs, findings)
 
 # 6. Step 3: Synthesize, summarize, and generate report using the flow
 research_flow.run(shared)
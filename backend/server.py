@@ -1,4 +1,4 @@
-import json
+import asyncio
 import logging
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, HTTPException
 from fastapi.responses import JSONResponse
@@ -11,7 +11,9 @@ from agent.flow import create_general_agent_flow, create_streaming_chat_flow
 from agent.utils.node_registry import node_registry
 from agent.utils.workflow_store import workflow_store
 from agent.utils.permission_manager import permission_manager
-from agent.nodes import UserResponseRequiredException
+from agent.nodes import UserResponseRequiredException, warmup
+from agent.utils import json_utils
+from agent.utils.websocket_utils import WebSocketBatcher
 from logging_config import setup_logging, get_logger
 
 # Setup logging
@@ -180,6 +182,8 @@ async def startup_event():
     logger.info("Server startup: initializing general agent system...")
     logger.info(f"Loaded {len(node_registry.get_all_nodes())} nodes")
     logger.info(f"Loaded {len(workflow_store.get_all_workflows())} workflows")
+    # Build cached registry/prompt state off the event loop before the first request
+    await asyncio.to_thread(warmup)
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -196,13 +200,14 @@ async def websocket_endpoint(websocket: WebSocket):
         "waiting_for_user_response": False,
         "waiting_for_permission": False,
         "pending_user_question": None,
-        "pending_permission_request": None
+        "pending_permission_request": None,
+        "ws_batcher": WebSocketBatcher(websocket)
     }
     
     try:
         while True:
             data = await websocket.receive_text()
-            message = json.loads(data)
+            message = json_utils.loads(data)
             
             # Handle different message types
             message_type = message.get("type", "chat")
@@ -227,16 +232,16 @@ async def websocket_endpoint(websocket: WebSocket):
                         }
                     except Exception as e:
                         logger.error(f"❌ Workflow execution failed: {e}")
-                        await websocket.send_text(json.dumps({
+                        await shared_store["ws_batcher"].enqueue({
                             "type": "error",
                             "content": f"Workflow execution failed: {str(e)}"
-                        }))
+                        })
                 else:
                     # Still waiting for user input, ignore new chat messages
-                    await websocket.send_text(json.dumps({
+                    await shared_store["ws_batcher"].enqueue({
                         "type": "error",
                         "content": "Please respond to the current question or permission request first."
-                    }))
+                    })
                 
             elif message_type == "user_response":
                 # User response to a question
@@ -291,10 +296,10 @@ async def websocket_endpoint(websocket: WebSocket):
                         }
                     except Exception as e:
                         logger.error(f"❌ Failed to continue workflow: {e}")
-                        await websocket.send_text(json.dumps({
+                        await shared_store["ws_batcher"].enqueue({
                             "type": "error",
                             "content": f"Failed to continue workflow: {str(e)}"
-                        }))
+                        })
                         # 清除暂停状态
                         shared_store.pop("paused_workflow", None)
                 else:
@@ -337,20 +342,23 @@ async def websocket_endpoint(websocket: WebSocket):
                 
             else:
                 # Unknown message type
-                await websocket.send_text(json.dumps({
+                await shared_store["ws_batcher"].enqueue({
                     "type": "error",
                     "content": f"Unknown message type: {message_type}"
-                }))
+                })
                 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
         pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        await websocket.send_text(json.dumps({
+        await shared_store["ws_batcher"].enqueue({
             "type": "error",
             "content": f"Server error: {str(e)}"
-        }))
+        })
+    finally:
+        # Frames queued just before the loop ended (workflow_complete, errors) still go out
+        await shared_store["ws_batcher"].close()
 
 # Legacy WebSocket endpoint for backward compatibility
 @app.websocket("/api/v1/ws/chat")
@@ -363,7 +371,7 @@ async def legacy_chat_endpoint(websocket: WebSocket):
     try:
         while True:
             data = await websocket.receive_text()
-            message = json.loads(data)
+            message = json_utils.loads(data)
             shared_store["user_message"] = message.get("content", "")
             flow = create_streaming_chat_flow()
             await flow.run_async(shared_store)